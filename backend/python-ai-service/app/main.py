@@ -1,6 +1,10 @@
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import jobs, resumes, screening, ai_services
+from app.routers import jobs, resumes, screening, ai_services, embeddings
+from app.services.embeddings import embedding_registry
+from app.services.tasks import task_runner
+from app.services.uploads import RequestSizeLimit, UPLOAD_MAX_REQUEST_BYTES
 
 app = FastAPI(title="Recruit Backend", version="1.0.0")
 
@@ -12,6 +16,13 @@ origins = [
     "http://127.0.0.1:5173",
 ]
 
+# Added before CORS so the 413 still carries CORS headers
+app.add_middleware(
+    RequestSizeLimit,
+    limit=UPLOAD_MAX_REQUEST_BYTES,
+    paths=["/api/resumes/upload"],
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,  # <- do NOT use "*" if you set allow_credentials=True
@@ -25,6 +36,22 @@ app.include_router(jobs.router, prefix="/api")
 app.include_router(resumes.router, prefix="/api")
 app.include_router(screening.router, prefix="/api")
 app.include_router(ai_services.router, prefix="/api")
+app.include_router(embeddings.router, prefix="/api")
+
+
+@app.on_event("startup")
+def warmup_embedding_model():
+    # Off by default so dev reloads stay fast; set EMBEDDING_WARMUP=1 in workers
+    if os.getenv("EMBEDDING_WARMUP", "").lower() in {"1", "true", "yes"}:
+        embedding_registry.warmup()
+
+
+@app.on_event("startup")
+def resume_background_tasks():
+    # Pick up tasks a stopped worker left queued/running (tasks a live sibling
+    # worker owns are left alone); the per-job manifest makes the re-run skip
+    # files that were already inserted
+    task_runner.resume_unfinished()
 
 
 @app.get("/")
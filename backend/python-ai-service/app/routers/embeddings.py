@@ -0,0 +1,107 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Tuple
+import os
+import logging
+import weaviate
+
+from app.services.embeddings import (
+    EMBEDDING_BACKENDS,
+    embedding_registry,
+    embedding_batcher,
+    embedding_cache,
+    get_registry,
+)
+from app.services.embedding_eval import parity_check, benchmark
+
+router = APIRouter(tags=["embeddings"])
+logger = logging.getLogger(__name__)
+
+
+def fetch_candidate_vectors(limit: int) -> Tuple[List[str], List[List[float]]]:
+    """Resume summaries and their stored fp32 vectors from the Candidate collection"""
+    client = weaviate.connect_to_weaviate_cloud(
+        cluster_url=os.getenv("WEAVIATE_URL"),
+        auth_credentials=weaviate.auth.AuthApiKey(os.getenv("WEAVIATE_API_KEY")),
+    )
+    try:
+        coll = client.collections.get("Candidate")
+        resp = coll.query.fetch_objects(
+            limit=limit, return_properties=["resume_summary"], include_vector=True
+        )
+        texts, vectors = [], []
+        for o in resp.objects:
+            summary = o.properties.get("resume_summary")
+            vector = (o.vector or {}).get("default")
+            if summary and vector:
+                texts.append(summary)
+                vectors.append(vector)
+        return texts, vectors
+    finally:
+        client.close()
+
+
+def _check_backend(backend: str) -> None:
+    if backend not in EMBEDDING_BACKENDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"backend must be one of {', '.join(EMBEDDING_BACKENDS)}",
+        )
+
+
+@router.get(
+    "/embeddings/stats",
+    response_model=dict,
+    summary="Embedding model load time, resident memory, batching and cache metrics",
+)
+def embedding_stats():
+    return {
+        **embedding_registry.stats(),
+        "batching": embedding_batcher.stats(),
+        "cache": embedding_cache.stats(),
+    }
+
+
+@router.post(
+    "/embeddings/warmup", response_model=dict, summary="Load the embedding model now"
+)
+def embedding_warmup():
+    stats = embedding_registry.warmup()
+    logger.info(f"Embedding model warmed up: {stats}")
+    return stats
+
+
+@router.post(
+    "/embeddings/parity",
+    response_model=dict,
+    summary="Cosine drift of a backend against vectors stored on Candidate",
+)
+def embedding_parity(
+    backend: str = Query("onnx-int8"), limit: int = Query(100, ge=1, le=1000)
+):
+    _check_backend(backend)
+    texts, stored = fetch_candidate_vectors(limit)
+    if not texts:
+        raise HTTPException(status_code=404, detail="No candidates with vectors found")
+    return parity_check(get_registry(backend), texts, stored)
+
+
+@router.post(
+    "/embeddings/benchmark",
+    response_model=dict,
+    summary="Compare encode throughput of the fp32 and an alternative backend",
+)
+def embedding_benchmark(
+    backend: str = Query("onnx-int8"),
+    limit: int = Query(100, ge=1, le=1000),
+    batch_size: int = Query(32, ge=1, le=256),
+):
+    _check_backend(backend)
+    texts, _ = fetch_candidate_vectors(limit)
+    if not texts:
+        raise HTTPException(status_code=404, detail="No candidates with vectors found")
+    baseline = benchmark(get_registry("torch"), texts, batch_size)
+    contender = benchmark(get_registry(backend), texts, batch_size)
+    speedup = None
+    if baseline["texts_per_second"] and contender["texts_per_second"]:
+        speedup = round(contender["texts_per_second"] / baseline["texts_per_second"], 2)
+    return {"baseline": baseline, "contender": contender, "speedup": speedup}
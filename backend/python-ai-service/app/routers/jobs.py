@@ -4,20 +4,18 @@ from typing import List, Optional
 from google import genai
 import os
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
 import weaviate
 from weaviate.classes.query import Filter  # Correct import
 from datetime import datetime
 import hashlib
 
+from app.services.embeddings import embedder
+from app.services.evaluation_cache import invalidate_job
+
 load_dotenv()
 
 router = APIRouter(tags=["jobs"])
 
-st = SentenceTransformer("all-mpnet-base-v2")
-EMB_DIM = st.get_sentence_embedding_dimension()
-
-
 # ----- request/response models -----
 class JobRequest(BaseModel):
     job_title: str = Field(..., examples=["Senior Frontend Developer"])
@@ -41,6 +39,11 @@ class JobResponse(BaseModel):
     description: str
 
 
+class JobDescriptionUpdate(BaseModel):
+    job_id: str = Field(..., examples=["769a7894"])
+    description: str = Field(..., description="New job description text")
+
+
 class JobLite(BaseModel):
     job_id: str
     title: Optional[str] = None
@@ -59,9 +62,9 @@ def as_rfc3339(date_str: str) -> str:
     return f"{date_str}T00:00:00Z"
 
 
-# Generate embedding using sentence transformers
+# Generate embedding using the shared sentence transformer
 def embed(text: str):
-    return st.encode(text or "", normalize_embeddings=True).tolist()
+    return embedder.embed(text)
 
 
 # Generate unique job ID based on job title and creation date
@@ -269,3 +272,40 @@ def job_by_id(job_id: str = Query(...)):
         }
     finally:
         client.close()
+
+
+@router.put(
+    "/jobs/description",
+    response_model=JobResponse,
+    summary="Edit a job description (re-embeds it and drops cached screenings)",
+)
+def update_job_description(req: JobDescriptionUpdate):
+    client = weaviate.connect_to_weaviate_cloud(
+        cluster_url=os.getenv("WEAVIATE_URL"),
+        auth_credentials=weaviate.auth.AuthApiKey(os.getenv("WEAVIATE_API_KEY")),
+    )
+    try:
+        coll = client.collections.get("Job")
+        resp = coll.query.fetch_objects(
+            filters=Filter.by_property("job_id").equal(req.job_id),
+            limit=1,
+            return_properties=["name"],
+        )
+        if not resp.objects:
+            raise HTTPException(status_code=404, detail="Job not found")
+        o = resp.objects[0]
+        coll.data.update(
+            uuid=o.uuid,
+            properties={"job_description": req.description},
+            vector=embed(req.description),
+        )
+    finally:
+        client.close()
+
+    # Evaluations against the old description must not be served again
+    invalidate_job(req.job_id)
+    return {
+        "job_id": req.job_id,
+        "title": o.properties.get("name"),
+        "description": req.description,
+    }
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, UploadFile, File, Form, Query, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, Query, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, model_validator, field_validator
-from typing import List, Optional
+from typing import Callable, Dict, List, Literal, Optional, Tuple
 import os
+import re
+import glob
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
 from dotenv import load_dotenv
 from google import genai
@@ -9,7 +17,52 @@ import json
 from datetime import datetime, timezone
 import hashlib
 import logging
-from sentence_transformers import SentenceTransformer
+from uuid import uuid4
+import weaviate
+from weaviate.classes.query import Filter
+from llama_parse import LlamaParse
+from llama_index.core import SimpleDirectoryReader
+
+from app.services.embeddings import embedder
+from app.services.pdf_text import extract_local
+from app.services.compaction import (
+    COMPACTION_VERSION,
+    RESUME_COMPACTION,
+    RESUME_TOKEN_BUDGET,
+    compact,
+)
+from app.services.local_cache import LocalCache
+from app.services.uploads import (
+    AtomicPdfWriter,
+    ByteBudget,
+    UPLOAD_CHUNK_BYTES,
+    UPLOAD_MAX_FILE_BYTES,
+    UPLOAD_MAX_REQUEST_BYTES,
+    UploadRejected,
+)
+from app.services.zip_stream import (
+    ZipRejected,
+    ZipStreamReader,
+    safe_member_filename,
+)
+from app.services.pipeline import (
+    PipelineCancelled,
+    PipelineDone,
+    Stage,
+    StagedPipeline,
+)
+from app.services.dedup import DedupSession, NearDuplicateIndex
+from app.services.checkpoints import CheckpointStore
+from app.services.metrics import HistogramFamily, StageTimings
+from app.services.tasks import TaskContext, task_runner, task_store, STATUS_QUEUED
+from app.services.manifest import (
+    JobManifest,
+    file_sha256,
+    STATE_PENDING,
+    STATE_PROCESSED,
+    STATE_INSERTED,
+    STATE_FAILED,
+)
 
 load_dotenv()
 router = APIRouter(tags=["resumes"])
@@ -17,8 +70,59 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 UPLOAD_ROOT = os.getenv("UPLOAD_ROOT", "./data/uploads")
-st = SentenceTransformer("all-mpnet-base-v2")
-EMB_DIM = st.get_sentence_embedding_dimension()
+# Per-stage worker limits for process_folder (parse, LLM extraction, summary, embed)
+PARSE_CONCURRENCY = int(os.getenv("RESUME_PARSE_CONCURRENCY", "4"))
+EXTRACT_CONCURRENCY = int(os.getenv("RESUME_EXTRACT_CONCURRENCY", "4"))
+SUMMARY_CONCURRENCY = int(os.getenv("RESUME_SUMMARY_CONCURRENCY", "4"))
+EMBED_CONCURRENCY = int(os.getenv("RESUME_EMBED_CONCURRENCY", "4"))
+PROCESS_TASK_KIND = "resumes.process"
+# Extra batch attempts for candidates whose Weaviate insert failed
+INSERT_RETRIES = int(os.getenv("RESUME_INSERT_RETRIES", "2"))
+# Try the PDF text layer before paying for LlamaParse
+LOCAL_PDF_EXTRACTION = os.getenv("LOCAL_PDF_EXTRACTION", "1").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+
+# Reuse profile + vector of near-duplicate resumes instead of re-running the LLMs
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1").lower() in {"1", "true", "yes"}
+dedup_index = NearDuplicateIndex() if DEDUP_ENABLED else None
+
+# Extracted markdown keyed by sha256 of the PDF bytes, shared across jobs
+parse_cache = LocalCache(
+    os.getenv("PARSE_CACHE_PATH", "./data/cache/parsed_documents.sqlite3"),
+    max_bytes=int(os.getenv("PARSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    name="parse_cache",
+)
+
+# Parses started while a ZIP upload is still streaming, per job_id
+_prewarm_pool = ThreadPoolExecutor(
+    max_workers=PARSE_CONCURRENCY, thread_name_prefix="prewarm"
+)
+_prewarm_futures: Dict[str, List[Future]] = {}
+_prewarm_lock = threading.Lock()
+
+# Last finished stage output of every PDF, so an interrupted run resumes there
+checkpoint_store = CheckpointStore()
+CHECKPOINT_STAGES = ("parse", "extract", "summary", "embed")
+
+# Latency of every processing stage across requests, see /resumes/timings/stats
+stage_histograms = HistogramFamily()
+
+LLM_MODEL = "gemini-2.5-flash"
+# Gemini extraction / summary responses, see llm_cache_key
+llm_cache = LocalCache(
+    os.getenv("LLM_CACHE_PATH", "./data/cache/llm_responses.sqlite3"),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(128 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600))),
+    name="llm_cache",
+)
+
+# Progress callback for processing, called as
+# (filename, stage, status, error, seconds[, payload]); payload is only passed
+# once a candidate is inserted and carries its public fields
+FileEventCallback = Callable[..., None]
 
 
 # ----- Pydantic models (matching original script) -----
@@ -184,6 +288,13 @@ class ApplicantProfile(BaseModel):
         return v
 
 
+class ApplicantProfileWithSummary(ApplicantProfile):
+    resume_summary: Optional[str] = Field(
+        default=...,
+        description="A 200 to 250 word recruiter-facing summary of the resume covering core skills (one comma-separated line), work experience, education, projects & achievements, transferable skills and total years of experience, in a concise and professional tone.",
+    )
+
+
 # ----- Helper functions (matching original script) -----
 def ensure_job_dir(job_id: str) -> Path:
     job_dir = Path(UPLOAD_ROOT) / job_id
@@ -192,7 +303,7 @@ def ensure_job_dir(job_id: str) -> Path:
     return job_dir
 
 
-def extract_content(file_path: str) -> str:
+def extract_content_llamaparse(file_path: str) -> str:
     """Extract content from PDF using LlamaParse (matching original script)"""
     try:
         logger.info(f"Starting content extraction from: {file_path}")
@@ -221,19 +332,56 @@ def extract_content(file_path: str) -> str:
         raise
 
 
-def extract_information(document_text: str) -> str:
-    """Extract structured information using LLM (matching original script)"""
-    try:
-        logger.info("Starting information extraction with Gemini LLM")
-        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+def extract_content_tiered(file_path: str) -> Tuple[str, dict]:
+    """
+    Try the PDF's own text layer first and only send scanned or low-quality
+    documents to LlamaParse.
+    Returns:
+      - (text, report) where report has the tier used, seconds and quality metrics
+    """
+    started = time.perf_counter()
+    report: dict = {"tier": "llamaparse"}
+    if LOCAL_PDF_EXTRACTION:
+        try:
+            text, quality = extract_local(file_path)
+            report["local_quality"] = quality
+            if quality["ok"]:
+                report["tier"] = "local"
+                report["seconds"] = round(time.perf_counter() - started, 4)
+                logger.info(
+                    f"Extracted {os.path.basename(file_path)} locally "
+                    f"in {report['seconds']}s ({quality})"
+                )
+                return text, report
+            logger.info(
+                f"Local text of {os.path.basename(file_path)} too weak ({quality}), "
+                "falling back to LlamaParse"
+            )
+        except Exception as e:
+            logger.warning(f"Local extraction failed for {file_path}: {e}")
+            report["local_error"] = str(e)
+
+    text = extract_content_llamaparse(file_path)
+    report["seconds"] = round(time.perf_counter() - started, 4)
+    logger.info(
+        f"Extracted {os.path.basename(file_path)} with LlamaParse in {report['seconds']}s"
+    )
+    return text, report
+
 
-        prompt = f"""
+def extract_content(file_path: str) -> str:
+    """Extract content from PDF, locally when possible, else with LlamaParse"""
+    text, _ = extract_content_tiered(file_path)
+    return text
+
+
+EXTRACT_PROMPT_TEMPLATE = """
         You are an expert in analyzing resume/curriculum vitae (CV). 
 
         Your task:
         1.Use the following JSON schema to extract relevant information:
         ```json
-        {ApplicantProfile.model_json_schema()}
+        {schema}
         ```json
         2.Extract the information from the following document and provide a structured JSON response strictly adhering to the schema above. 
         3.Do not make up any information.
@@ -248,8 +396,125 @@ def extract_information(document_text: str) -> str:
         ----------------
         """
 
+SUMMARY_PROMPT_TEMPLATE = """
+        You are a professional career assistant that specialized in summarizing resumes for recruiters. Your task is to generate summary of a candidate's resume.
+
+        Your summary must include:
+        1.Core skills - list programming languages, frameworks, tools and technical expertise in a single line, separated by commas (avoid sentences or adjectives).
+        2.Work experience - emphasize relevant roles, industries and contributions.
+        3.Education - highlight highest degree and relevant qualifications.
+        4.Projects & Achievements - highlight key projects, outcome, innovations or impact.
+        5.Transferable skills - highlight key transferable skills that can be applied across different roles or industries. Point out cross-functional strengths that make the candidate a strong hire.
+        6.Years of experience - highlight total years of experience in the field.
+
+        Response format:
+        1.Reply in a concise and professional tone.
+        2.Keep the summary between 200 to 250 words.
+        3.Make sure you dont exceed the word limit of 250 words.
+        
+        Summarize the following resume:
+        ----------------
+        {resume_json}
+        ----------------
+        """
+
+# Single-call mode: profile and resume_summary under one response schema
+COMBINED_PROMPT_TEMPLATE = """
+        You are an expert in analyzing resume/curriculum vitae (CV) and a professional career assistant that specialized in summarizing resumes for recruiters.
+
+        Your task:
+        1.Use the following JSON schema to extract relevant information:
+        ```json
+        {schema}
+        ```json
+        2.Extract the information from the following document and provide a structured JSON response strictly adhering to the schema above.
+        3.Do not make up any information.
+        4.Fill `resume_summary` with a summary of the resume that includes:
+          - Core skills - list programming languages, frameworks, tools and technical expertise in a single line, separated by commas (avoid sentences or adjectives).
+          - Work experience - emphasize relevant roles, industries and contributions.
+          - Education - highlight highest degree and relevant qualifications.
+          - Projects & Achievements - highlight key projects, outcome, innovations or impact.
+          - Transferable skills - highlight key transferable skills that can be applied across different roles or industries. Point out cross-functional strengths that make the candidate a strong hire.
+          - Years of experience - highlight total years of experience in the field.
+          Keep it between 200 to 250 words, in a concise and professional tone.
+
+        Response format:
+        1.Please remove any ```json ``` characters from the output.
+        2.If a field cannot be extracted or information is not available, mark it as `n/a`.
+
+        Document:
+        ----------------
+        {document_text}
+        ----------------
+        """
+
+EXTRACTION_MODE_TWO_CALL = "two_call"
+EXTRACTION_MODE_COMBINED = "combined"
+EXTRACTION_MODES = (EXTRACTION_MODE_TWO_CALL, EXTRACTION_MODE_COMBINED)
+DEFAULT_EXTRACTION_MODE = os.getenv("RESUME_EXTRACTION_MODE", EXTRACTION_MODE_TWO_CALL)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Template and schema hashes are part of every LLM cache key, so editing a
+# prompt or the ApplicantProfile model invalidates the affected entries
+EXTRACT_PROMPT_VERSION = _sha256(EXTRACT_PROMPT_TEMPLATE)[:12]
+SUMMARY_PROMPT_VERSION = _sha256(SUMMARY_PROMPT_TEMPLATE)[:12]
+COMBINED_PROMPT_VERSION = _sha256(
+    COMBINED_PROMPT_TEMPLATE
+    + json.dumps(ApplicantProfileWithSummary.model_json_schema(), sort_keys=True)
+)[:12]
+
+
+def applicant_schema_hash() -> str:
+    schema = json.dumps(ApplicantProfile.model_json_schema(), sort_keys=True)
+    return _sha256(schema)[:12]
+
+
+def checkpoint_version(extraction_mode: str = EXTRACTION_MODE_TWO_CALL) -> str:
+    """
+    Checkpoints from other prompts, schema, extraction mode, compaction budget or
+    embedding model are not resumed
+    """
+    compaction = (
+        f"{COMPACTION_VERSION}:{RESUME_TOKEN_BUDGET}"
+        if RESUME_COMPACTION
+        else "uncompacted"
+    )
+    return _sha256(
+        f"{extraction_mode}:{EXTRACT_PROMPT_VERSION}:{SUMMARY_PROMPT_VERSION}:"
+        f"{COMBINED_PROMPT_VERSION}:{applicant_schema_hash()}:"
+        f"{embedder.cache.model_name}:{compaction}"
+    )[:12]
+
+
+def llm_cache_key(kind: str, document: str, prompt_version: str) -> str:
+    """(kind, model, prompt template version, schema hash, document hash) cache key"""
+    return ":".join(
+        [kind, LLM_MODEL, prompt_version, applicant_schema_hash(), _sha256(document)]
+    )
+
+
+def extract_information(document_text: str) -> str:
+    """Extract structured information using LLM (matching original script)"""
+    cache_key = llm_cache_key("extract", document_text, EXTRACT_PROMPT_VERSION)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Using cached information extraction")
+        return cached
+
+    try:
+        logger.info("Starting information extraction with Gemini LLM")
+        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+        prompt = EXTRACT_PROMPT_TEMPLATE.format(
+            schema=ApplicantProfile.model_json_schema(), document_text=document_text
+        )
+
         response = client.models.generate_content(
-            model="gemini-2.5-flash",
+            model=LLM_MODEL,
             contents=prompt,
             config={
                 "response_mime_type": "application/json",
@@ -260,6 +525,8 @@ def extract_information(document_text: str) -> str:
         if not response or not response.text:
             raise ValueError("Failed to get a response from LLM.")
 
+        json.loads(response.text)  # only cache responses that parse
+        llm_cache.put(cache_key, response.text)
         logger.info("Successfully extracted information")
         return response.text
     except Exception as e:
@@ -269,43 +536,67 @@ def extract_information(document_text: str) -> str:
 
 def generate_summary(resume_json: dict) -> str:
     """Generate summary for each candidate (matching original script)"""
+    resume_json_str = json.dumps(resume_json)
+    cache_key = llm_cache_key("summary", resume_json_str, SUMMARY_PROMPT_VERSION)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Using cached summary")
+        return cached
+
     try:
         logger.info("Starting summary generation with Gemini LLM")
         client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
-        prompt = f"""
-        You are a professional career assistant that specialized in summarizing resumes for recruiters. Your task is to generate summary of a candidate's resume.
+        prompt = SUMMARY_PROMPT_TEMPLATE.format(resume_json=resume_json_str)
 
-        Your summary must include:
-        1.Core skills - list programming languages, frameworks, tools and technical expertise in a single line, separated by commas (avoid sentences or adjectives).
-        2.Work experience - emphasize relevant roles, industries and contributions.
-        3.Education - highlight highest degree and relevant qualifications.
-        4.Projects & Achievements - highlight key projects, outcome, innovations or impact.
-        5.Transferable skills - highlight key transferable skills that can be applied across different roles or industries. Point out cross-functional strengths that make the candidate a strong hire.
-        6.Years of experience - highlight total years of experience in the field.
+        response = client.models.generate_content(model=LLM_MODEL, contents=prompt)
 
-        Response format:
-        1.Reply in a concise and professional tone.
-        2.Keep the summary between 200 to 250 words.
-        3.Make sure you dont exceed the word limit of 250 words.
-        
-        Summarize the following resume:
-        ----------------
-        {json.dumps(resume_json)}
-        ----------------
-        """
+        if not response or not response.text:
+            raise ValueError("Failed to get a response from LLM.")
+
+        llm_cache.put(cache_key, response.text)
+        logger.info("Successfully generated summary")
+        return response.text
+    except Exception as e:
+        logger.error(f"Failed to generate summary: {str(e)}")
+        raise
+
+
+def extract_information_with_summary(document_text: str) -> str:
+    """Extract the profile and resume_summary in a single structured LLM call"""
+    cache_key = llm_cache_key("combined", document_text, COMBINED_PROMPT_VERSION)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Using cached combined extraction")
+        return cached
+
+    try:
+        logger.info("Starting combined extraction and summary with Gemini LLM")
+        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+        prompt = COMBINED_PROMPT_TEMPLATE.format(
+            schema=ApplicantProfileWithSummary.model_json_schema(),
+            document_text=document_text,
+        )
 
         response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=prompt
+            model=LLM_MODEL,
+            contents=prompt,
+            config={
+                "response_mime_type": "application/json",
+                "response_schema": ApplicantProfileWithSummary,
+            },
         )
 
         if not response or not response.text:
             raise ValueError("Failed to get a response from LLM.")
 
-        logger.info("Successfully generated summary")
+        json.loads(response.text)  # only cache responses that parse
+        llm_cache.put(cache_key, response.text)
+        logger.info("Successfully extracted information and summary")
         return response.text
     except Exception as e:
-        logger.error(f"Failed to generate summary: {str(e)}")
+        logger.error(f"Failed to extract information and summary: {str(e)}")
         raise
 
 
@@ -313,7 +604,7 @@ def embed(text: str) -> List[float]:
     """Generate embedding for text (matching original script)"""
     try:
         logger.info("Starting text embedding")
-        result = st.encode(text or "", normalize_embeddings=True).tolist()
+        result = embedder.embed(text)
         logger.info("Successfully embedded text")
         return result
     except Exception as e:
@@ -398,62 +689,610 @@ def generate_candidate_id(candidate_name: str, resume_summary: str) -> str:
     return full_hash[:8]
 
 
-def process_folder(folder_path: str, job_id: str) -> List[dict]:
+def parse_candidate(
+    document_content: str, timings: Optional[StageTimings] = None
+) -> dict:
+    """Ask the LLM to structure the resume and validate it with the Pydantic models"""
+    timings = timings or StageTimings()
+    with timings.span("extract.llm"):
+        info_json = extract_information(document_content)
+    with timings.span("extract.validate"):
+        return validate_profile(json.loads(info_json))
+
+
+def parse_candidate_with_summary(
+    document_content: str, timings: Optional[StageTimings] = None
+) -> dict:
     """
-    Process all PDFs in a folder (based on original script logic).
-    Returns:
-      - candidates: list of validated dicts (candidates[i] == parsed CV i)
+    Combined extraction mode: one LLM call returns the profile and its
+    resume_summary. Falls back to a separate summary call if it is missing.
     """
-    if not os.path.isdir(folder_path):
-        raise NotADirectoryError(f"{folder_path} is not a folder.")
+    timings = timings or StageTimings()
+    with timings.span("extract.llm"):
+        info_json = extract_information_with_summary(document_content)
+    with timings.span("extract.validate"):
+        parsed = json.loads(info_json)
+        resume_summary = parsed.pop("resume_summary", None)
+        candidate = validate_profile(parsed)
+    if isinstance(resume_summary, str) and resume_summary.strip().lower() not in {
+        "",
+        "n/a",
+        "none",
+    }:
+        candidate["resume_summary"] = resume_summary.strip()
+    else:
+        logger.warning("Combined extraction returned no summary, generating it")
+        with timings.span("summary.fallback"):
+            summarize_candidate(candidate)
+    return candidate
+
+
+def validate_profile(parsed: dict) -> dict:
+    """Validate an extracted profile with the Pydantic models"""
+    parsed["experience"] = [
+        Experience.model_validate(e) for e in parsed["experience"]
+    ]
+    parsed["education"] = [Education.model_validate(e) for e in parsed["education"]]
+    parsed["projects"] = [Project.model_validate(p) for p in parsed["projects"]]
+    validated = ApplicantProfile.model_validate(parsed)
+    return validated.model_dump()
+
+
+def summarize_candidate(candidate: dict) -> dict:
+    candidate["resume_summary"] = generate_summary(candidate)
+    return candidate
+
+
+def embed_candidate(candidate: dict, job_id: str) -> dict:
+    resume_summary = candidate["resume_summary"]
+    candidate["resume_summary_vector"] = embed(resume_summary)
+    candidate["job_id"] = job_id
+    candidate["candidate_id"] = generate_candidate_id(
+        candidate.get("name"), resume_summary
+    )
+    return candidate
+
+
+def parse_document(pdf_path: str, sha: str) -> Tuple[str, dict]:
+    """
+    Extracted text of a PDF, from parse_cache when the same bytes were parsed
+    before (report tier "cache"), else via extract_content_tiered
+    """
+    started = time.perf_counter()
+    cached = parse_cache.get(sha)
+    if cached is not None:
+        entry = json.loads(cached)
+        report = {
+            "tier": "cache",
+            "cached_tier": entry.get("tier"),
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+        return entry["text"], report
+
+    text, report = extract_content_tiered(pdf_path)
+    parse_cache.put(sha, json.dumps({"text": text, "tier": report["tier"]}))
+    return text, report
+
+
+def prewarm_parse(job_id: str, pdf_path: str, sha: str) -> None:
+    """
+    Parse a freshly uploaded PDF in the background so a processing run queued
+    afterwards finds its text in parse_cache
+    """
+
+    def run():
+        try:
+            parse_document(pdf_path, sha)
+        except Exception as e:
+            # The processing run parses it again and records the failure
+            logger.warning(f"Pre-parse failed for {pdf_path}: {e}")
+
+    with _prewarm_lock:
+        _prewarm_futures.setdefault(job_id, []).append(_prewarm_pool.submit(run))
 
+
+def wait_for_prewarm(job_id: str) -> None:
+    """Block until pre-parses of a job finish, so no file is parsed twice"""
+    with _prewarm_lock:
+        futures = _prewarm_futures.pop(job_id, [])
+    if futures:
+        logger.info(f"Waiting for {len(futures)} pre-parses of job {job_id}")
+        wait(futures)
+
+
+def select_pending_pdfs(
+    folder_path: str, manifest: JobManifest, force: bool = False
+) -> Tuple[List[str], List[str]]:
+    """
+    Split the folder's PDFs into those that need processing and those whose
+    exact content is already inserted. Pending files are recorded with their
+    new hash in the manifest.
+    Returns:
+      - (pending pdf paths, skipped filenames), both in sorted filename order
+    """
     pdf_paths = sorted(glob.glob(os.path.join(folder_path, "*.pdf")))
     if not pdf_paths:
         raise FileNotFoundError(f"No PDFs found in {folder_path}")
 
-    candidates: List[dict] = []
+    pending, skipped = [], []
+    for path in pdf_paths:
+        name = os.path.basename(path)
+        sha = file_sha256(path)
+        if manifest.needs_processing(name, sha, force):
+            manifest.mark(
+                name, save=False, sha256=sha, state=STATE_PENDING, error=None
+            )
+            pending.append(path)
+        else:
+            skipped.append(name)
+    manifest.save()
+    return pending, skipped
+
+
+def process_folder(
+    folder_path: str,
+    job_id: str,
+    force: bool = False,
+    manifest: Optional[JobManifest] = None,
+    pdf_paths: Optional[List[str]] = None,
+    on_file_event: Optional[FileEventCallback] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    timings: Optional[StageTimings] = None,
+    extraction_mode: str = DEFAULT_EXTRACTION_MODE,
+) -> List[dict]:
+    """
+    Process new or changed PDFs in a folder (based on original script logic).
+    Parsing, LLM extraction, summarization and embedding run as a staged
+    pipeline so different files overlap; a file that fails any stage is skipped.
+    Files already inserted with the same content are skipped unless force=True.
+    Each stage output is checkpointed per file, so a re-run after a crash or
+    cancel resumes every file after its last finished stage (force=True starts
+    over). on_file_event(filename, stage, status, error, seconds) is called as
+    each file finishes or fails a stage (see FileEventCallback); should_cancel()
+    stops remaining work. Stage durations (and parse tier / LLM / validation
+    sub-spans) are recorded in timings. extraction_mode "combined" gets the
+    profile and summary from one LLM call instead of two (no summary stage).
+    With RESUME_COMPACTION on, parsed text is compacted to RESUME_TOKEN_BUDGET
+    before extraction and the token counts are kept in the manifest.
+    Returns:
+      - candidates: list of validated dicts, in sorted filename order, each
+        tagged with its "source_file"
+    """
+    if not os.path.isdir(folder_path):
+        raise NotADirectoryError(f"{folder_path} is not a folder.")
+    if extraction_mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown extraction mode {extraction_mode!r}")
+
+    if manifest is None:
+        manifest = JobManifest.load(folder_path)
+    if pdf_paths is None:
+        pdf_paths, skipped = select_pending_pdfs(folder_path, manifest, force)
+        if skipped:
+            logger.info(
+                f"Skipping {len(skipped)} already inserted PDFs in {folder_path}"
+            )
+    if not pdf_paths:
+        return []
+
+    timings = timings or StageTimings(stage_histograms)
+    version = checkpoint_version(extraction_mode)
+    hashes = [
+        manifest.get(os.path.basename(p)).get("sha256") or file_sha256(p)
+        for p in pdf_paths
+    ]
+
+    def on_stage_done(idx: int, stage: str, value, seconds: float):
+        name = os.path.basename(pdf_paths[idx])
+        print(f"[{idx+1}/{len(pdf_paths)}] {stage} done for {name} in {seconds:.2f}s")
+        timings.record(stage, seconds)
+        # A reused duplicate profile is already a finished (embedded) candidate
+        if stage == "dedup" and isinstance(value, dict):
+            stage = "embed"
+        if stage in CHECKPOINT_STAGES:
+            try:
+                checkpoint_store.save(
+                    job_id, name, hashes[idx], version, stage, value
+                )
+            except Exception as e:
+                logger.warning(f"Checkpoint of {name} after {stage} failed: {e}")
+        if on_file_event:
+            on_file_event(name, stage, "done", None, seconds)
+
+    def parse_pdf(idx: int, pdf_path: str) -> str:
+        text, report = parse_document(pdf_path, hashes[idx])
+        timings.record(f"parse.{report['tier']}", report["seconds"])
+        manifest.mark(os.path.basename(pdf_path), parse=report)
+        return text
+
+    # A forced run re-processes from scratch, so it never reuses stored profiles
+    dedup = None
+    if dedup_index and not force:
+        dedup = DedupSession(
+            dedup_index, len(pdf_paths), version, embedder.cache.model_name
+        )
 
-    for idx, pdf_path in enumerate(pdf_paths):
-        print(f"\n[{idx+1}/{len(pdf_paths)}] Processing: {os.path.basename(pdf_path)}")
+    def reuse_duplicate(idx: int, text: str):
+        name = os.path.basename(pdf_paths[idx])
+        match = dedup.check(idx, text, source=(job_id, name))
+        if match is None:
+            return text
+        _, similarity, record = match
+        candidate = dict(record["profile"])
+        candidate["job_id"] = job_id
+        candidate["candidate_id"] = generate_candidate_id(
+            candidate.get("name"), candidate.get("resume_summary")
+        )
+        logger.info(
+            f"Reusing profile of {record['filename']} (job {record['job_id']}) "
+            f"for {name}, similarity {similarity:.3f}"
+        )
+        manifest.mark(
+            name,
+            duplicate_of={
+                "job_id": record["job_id"],
+                "filename": record["filename"],
+                "similarity": round(similarity, 4),
+            },
+        )
+        return PipelineDone(candidate)
 
-        try:
-            # 1) Extract raw text from PDF
-            document_content = extract_content(pdf_path)
-
-            # 2) Ask LLM to structure it & validate with Pydantic models
-            info_json = extract_information(document_content)
-            parsed = json.loads(info_json)
-            parsed["experience"] = [
-                Experience.model_validate(e) for e in parsed["experience"]
-            ]
-            parsed["education"] = [
-                Education.model_validate(e) for e in parsed["education"]
-            ]
-            parsed["projects"] = [Project.model_validate(p) for p in parsed["projects"]]
-            validated = ApplicantProfile.model_validate(parsed)
-
-            # 3) Generate summary and embedding
-            candidate = validated.model_dump()
-            resume_summary = generate_summary(candidate)
-            candidate["resume_summary"] = resume_summary
-            candidate["resume_summary_vector"] = embed(resume_summary)
-            candidate["job_id"] = job_id
-            candidate["candidate_id"] = generate_candidate_id(
-                candidate.get("name"), resume_summary
+    def remember_profile(idx: int, candidate: dict) -> dict:
+        profile = {
+            k: v for k, v in candidate.items() if k not in ("job_id", "candidate_id")
+        }
+        dedup.record(idx, profile, job_id, os.path.basename(pdf_paths[idx]))
+        return candidate
+
+    def compact_text(idx: int, text: str) -> str:
+        compacted, report = compact(text)
+        name = os.path.basename(pdf_paths[idx])
+        logger.info(
+            f"Compacted {name} from {report['tokens_before']} to "
+            f"{report['tokens_after']} tokens"
+        )
+        manifest.mark(name, compaction=report)
+        return compacted
+
+    def on_error(idx: int, stage: str, e: BaseException):
+        name = os.path.basename(pdf_paths[idx])
+        if dedup:
+            dedup.release(idx)
+        print(f"⚠️ Skipped {name} due to error: {e}")
+        manifest.mark(name, state=STATE_FAILED, error=f"{stage}: {e}")
+        if on_file_event:
+            on_file_event(name, stage, "failed", str(e), 0.0)
+
+    stages = [
+        # 1) Extract raw text from PDF
+        Stage("parse", parse_pdf, PARSE_CONCURRENCY, with_index=True),
+        # 2) Ask LLM to structure it & validate with Pydantic models
+        Stage(
+            "extract", lambda text: parse_candidate(text, timings), EXTRACT_CONCURRENCY
+        ),
+        # 3) Generate summary and embedding
+        Stage("summary", summarize_candidate, SUMMARY_CONCURRENCY),
+        Stage("embed", lambda c: embed_candidate(c, job_id), EMBED_CONCURRENCY),
+    ]
+    if extraction_mode == EXTRACTION_MODE_COMBINED:
+        # 2+3) One LLM call returns the profile together with its summary
+        stages[1:3] = [
+            Stage(
+                "extract",
+                lambda text: parse_candidate_with_summary(text, timings),
+                EXTRACT_CONCURRENCY,
             )
+        ]
+    if RESUME_COMPACTION:
+        # Strip noise and repeats, fit the token budget before the LLM sees it
+        stages.insert(
+            1, Stage("compact", compact_text, PARSE_CONCURRENCY, with_index=True)
+        )
+    if dedup:
+        # Near-duplicates finish right after parsing with the earlier profile
+        stages.insert(
+            1, Stage("dedup", reuse_duplicate, PARSE_CONCURRENCY, with_index=True)
+        )
+        stages.append(Stage("fingerprint", remember_profile, 1, with_index=True))
 
-            # 4) Append to results
-            candidates.append(candidate)
-
-        except Exception as e:
-            print(f"⚠️ Skipped {os.path.basename(pdf_path)} due to error: {e}")
+    # Resume each file after its last checkpointed stage
+    stage_names = [stage.name for stage in stages]
+    items: List = list(pdf_paths)
+    start_stages = [0] * len(pdf_paths)
+    for idx, pdf_path in enumerate(pdf_paths):
+        name = os.path.basename(pdf_path)
+        if force:
+            checkpoint_store.clear(job_id, name)
+            continue
+        checkpoint = checkpoint_store.load(job_id, name, hashes[idx], version)
+        if checkpoint is None:
+            continue
+        stage, value = checkpoint
+        # Resumed past the dedup check, so there is nothing to fingerprint
+        start_stages[idx] = (
+            len(stages) if stage == "embed" else stage_names.index(stage) + 1
+        )
+        items[idx] = value
+        logger.info(f"Resuming {name} after checkpointed {stage} stage")
+        manifest.mark(name, save=False, resumed_after=stage)
+        if on_file_event:
+            on_file_event(name, "checkpoint", "resumed", None, 0.0)
+    manifest.save()
+
+    pipeline = StagedPipeline(
+        stages,
+        on_stage_done=on_stage_done,
+        on_error=on_error,
+        should_cancel=should_cancel,
+    )
+    results = pipeline.run(items, start_stages=start_stages)
+    candidates: List[dict] = []
+    for pdf_path, (candidate, err) in zip(pdf_paths, results):
+        if err is not None:
+            continue
+        candidate["source_file"] = os.path.basename(pdf_path)
+        manifest.mark(
+            candidate["source_file"],
+            state=STATE_PROCESSED,
+            candidate_id=candidate["candidate_id"],
+        )
+        candidates.append(candidate)
 
+    if should_cancel and should_cancel():
+        raise PipelineCancelled("Processing cancelled")
     if not candidates:
         raise RuntimeError("No candidates were successfully parsed/validated.")
 
     return candidates
 
 
+def candidate_properties(item: dict) -> dict:
+    """Weaviate Candidate properties for a processed candidate"""
+    return {
+        "name": item.get("name"),
+        "email": item.get("email"),
+        "age": item.get("age"),
+        "skills": item.get("skills") or [],
+        "years_of_experience": item.get("years_of_experience"),
+        "highest_education": item.get("highest_education"),
+        "current_role": item.get("current_role"),
+        "function": item.get("function"),
+        "resume_summary": item.get("resume_summary"),
+        "education": map_education(item.get("education")),
+        "experience": map_experience(item.get("experience")),
+        "projects": map_projects(item.get("projects")),
+        "job_id": item.get("job_id"),
+        "social_links": item.get("social_links") or [],
+        "candidate_id": item.get("candidate_id"),
+    }
+
+
+def candidate_public_fields(item: dict) -> dict:
+    """Light view of a processed candidate (no vector) for progress events"""
+    return {
+        "candidate_id": item.get("candidate_id"),
+        "name": item.get("name"),
+        "email": item.get("email"),
+        "current_role": item.get("current_role"),
+        "years_of_experience": item.get("years_of_experience"),
+        "highest_education": item.get("highest_education"),
+        "skills": item.get("skills") or [],
+        "resume_summary": item.get("resume_summary"),
+        "job_id": item.get("job_id"),
+    }
+
+
+def insert_candidates(
+    candidates: List[dict],
+    manifest: JobManifest,
+    on_file_event: Optional[FileEventCallback] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    timings: Optional[StageTimings] = None,
+) -> Tuple[int, List[str]]:
+    """
+    Insert candidates to Weaviate with the dynamic batcher. Objects that fail are
+    mapped back to their source file and only those are retried (INSERT_RETRIES).
+    Each batch attempt is recorded in timings as "insert.batch". Objects from
+    earlier runs of a file are deleted only once its new object is inserted, so
+    a failed insert leaves the previous candidate in place.
+    Returns:
+      - (number inserted, error messages)
+    """
+    errors = []
+    pending = {}  # uuid -> (index, candidate)
+    for idx, item in enumerate(candidates):
+        if item.get("resume_summary_vector"):
+            pending[str(uuid4())] = (idx, item)
+            continue
+        error_msg = f"Candidate {idx} missing resume_summary_vector. Skipped."
+        print(f"⚠️ {error_msg}")
+        errors.append(error_msg)
+        if on_file_event:
+            on_file_event(item["source_file"], "insert", "failed", error_msg, 0.0)
+    if not pending:
+        return 0, errors
+    if should_cancel and should_cancel():
+        raise PipelineCancelled("Processing cancelled")
+    timings = timings or StageTimings(stage_histograms)
+
+    client = weaviate.connect_to_weaviate_cloud(
+        cluster_url=os.getenv("WEAVIATE_URL"),
+        auth_credentials=weaviate.auth.AuthApiKey(os.getenv("WEAVIATE_API_KEY")),
+    )
+
+    inserted = 0
+    # objects from earlier runs of these files, replaced once the new one is in
+    previous = {
+        obj_uuid: manifest.get(item["source_file"]).get("uuid")
+        for obj_uuid, (_, item) in pending.items()
+    }
+    replaced: List[str] = []
+
+    try:
+        cand = client.collections.get("Candidate")
+
+        last_errors = {}
+        for attempt in range(1 + INSERT_RETRIES):
+            started = time.perf_counter()
+            with cand.batch.dynamic() as batch:
+                for obj_uuid, (_, item) in pending.items():
+                    batch.add_object(
+                        properties=candidate_properties(item),
+                        vector=item["resume_summary_vector"],  # default vector space
+                        uuid=obj_uuid,
+                    )
+            elapsed = time.perf_counter() - started
+            timings.record("insert.batch", elapsed)
+            seconds = elapsed / len(pending)
+
+            last_errors = {
+                str(err.object_.uuid): err.message for err in cand.batch.failed_objects
+            }
+            for obj_uuid, (idx, item) in pending.items():
+                if obj_uuid in last_errors:
+                    continue
+                print(f"✅ Inserted candidate[{idx}] with UUID: {obj_uuid}")
+                manifest.mark(
+                    item["source_file"], save=False, state=STATE_INSERTED, uuid=obj_uuid
+                )
+                checkpoint_store.clear(item["job_id"], item["source_file"])
+                if previous[obj_uuid]:
+                    replaced.append(previous[obj_uuid])
+                inserted += 1
+                if on_file_event:
+                    on_file_event(
+                        item["source_file"],
+                        "insert",
+                        "done",
+                        None,
+                        seconds,
+                        {**candidate_public_fields(item), "uuid": obj_uuid},
+                    )
+            manifest.save()
+
+            pending = {u: pending[u] for u in last_errors if u in pending}
+            if not pending:
+                break
+            if should_cancel and should_cancel():
+                raise PipelineCancelled("Processing cancelled")
+            logger.warning(
+                f"Retrying {len(pending)} failed candidate inserts "
+                f"(attempt {attempt + 2}/{1 + INSERT_RETRIES})"
+            )
+
+        for obj_uuid, (idx, item) in pending.items():
+            message = last_errors.get(obj_uuid, "unknown error")
+            error_msg = (
+                f"Error inserting candidate[{idx}] ({item['source_file']}): {message}"
+            )
+            print(f"❌ {error_msg}")
+            errors.append(error_msg)
+            manifest.mark(
+                item["source_file"], save=False, state=STATE_FAILED, error=message
+            )
+            if on_file_event:
+                on_file_event(item["source_file"], "insert", "failed", message, 0.0)
+        manifest.save()
+
+    finally:
+        try:
+            if replaced:
+                with timings.span("insert.delete_previous"):
+                    cand.data.delete_many(where=Filter.by_id().contains_any(replaced))
+        except Exception as e:
+            logger.error(f"Failed to delete {len(replaced)} replaced candidates: {e}")
+        client.close()
+
+    return inserted, errors
+
+
+def ingest_job(
+    job_id: str,
+    force: bool = False,
+    on_file_event: Optional[FileEventCallback] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    include_timings: bool = False,
+    extraction_mode: str = DEFAULT_EXTRACTION_MODE,
+) -> dict:
+    """
+    Process new/changed PDFs for a job and insert the candidates to Weaviate.
+    Stage timings always feed stage_histograms; include_timings also returns
+    this run's breakdown as "timings".
+    """
+    timings = StageTimings(stage_histograms)
+    folder_path = os.path.join(UPLOAD_ROOT, job_id)
+    with timings.span("select"):
+        manifest = JobManifest.load(folder_path)
+        pdf_paths, skipped = select_pending_pdfs(folder_path, manifest, force)
+    if on_file_event:
+        for path in pdf_paths:
+            on_file_event(os.path.basename(path), "manifest", "queued", None, 0.0)
+        for name in skipped:
+            on_file_event(name, "manifest", "skipped", None, 0.0)
+
+    candidates = process_folder(
+        folder_path,
+        job_id,
+        force=force,
+        manifest=manifest,
+        pdf_paths=pdf_paths,
+        on_file_event=on_file_event,
+        should_cancel=should_cancel,
+        timings=timings,
+        extraction_mode=extraction_mode,
+    )
+    print(f"\n Parsed {len(candidates)} candidates, skipped {len(skipped)} unchanged")
+
+    with timings.span("insert"):
+        inserted, errors = insert_candidates(
+            candidates, manifest, on_file_event, should_cancel, timings
+        )
+    parse_tiers, compaction = {}, {}
+    for path in pdf_paths:
+        name = os.path.basename(path)
+        entry = manifest.get(name)
+        parse = entry.get("parse")
+        if parse:
+            parse_tiers[name] = {"tier": parse["tier"], "seconds": parse.get("seconds")}
+        if entry.get("compaction"):
+            compaction[name] = {
+                "tokens_before": entry["compaction"]["tokens_before"],
+                "tokens_after": entry["compaction"]["tokens_after"],
+            }
+    result = {
+        "job_id": job_id,
+        "total_candidates": len(candidates),
+        "inserted": inserted,
+        "skipped": skipped,
+        "errors": errors,
+        "parse_tiers": parse_tiers,
+        "compaction": compaction,
+        "extraction_mode": extraction_mode,
+    }
+    if include_timings:
+        result["timings"] = timings.summary()
+    return result
+
+
+def run_process_task(params: dict, ctx: TaskContext) -> dict:
+    """Background task handler for resume processing"""
+    wait_for_prewarm(params["job_id"])
+
+    def on_file_event(filename, stage, status, error, _seconds, _payload=None):
+        ctx.file_event(filename, stage, status, error)
+
+    return ingest_job(
+        params["job_id"],
+        force=params.get("force", False),
+        on_file_event=on_file_event,
+        should_cancel=ctx.cancelled,
+        include_timings=params.get("timings", False),
+        extraction_mode=params.get("extraction_mode", DEFAULT_EXTRACTION_MODE),
+    )
+
+
+task_runner.register(PROCESS_TASK_KIND, run_process_task)
+
+
 # ----- API Endpoints -----
 @router.post("/resumes/upload", response_model=dict, summary="Upload PDFs to server")
 async def upload_resumes(
@@ -465,30 +1304,135 @@ async def upload_resumes(
         raise HTTPException(status_code=422, detail="job_id is required")
 
     dest = ensure_job_dir(job_id)
-    saved, filenames, errors = 0, [], []
+    saved, filenames, errors, hashes = 0, [], [], {}
+    budget = ByteBudget(UPLOAD_MAX_REQUEST_BYTES)
 
     for f in files:
+        if budget.exhausted:
+            errors.append(
+                f"{f.filename or 'unknown'}: request byte limit reached, skipped"
+            )
+            continue
+        writer = None
         try:
             if not f.filename or not f.filename.lower().endswith(".pdf"):
                 errors.append(f"{f.filename or 'unknown'}: not a PDF, skipped")
                 continue
 
             safe_name = os.path.basename(f.filename)
-            path = os.path.join(dest, safe_name)
-            data = await f.read()
-
-            with open(path, "wb") as out:
-                out.write(data)
+            # Stream in chunks so memory stays at one chunk, not the whole file;
+            # disk writes and the fsync run off the event loop
+            writer = await run_in_threadpool(
+                AtomicPdfWriter, dest, safe_name, UPLOAD_MAX_FILE_BYTES, budget
+            )
+            while chunk := await f.read(UPLOAD_CHUNK_BYTES):
+                await run_in_threadpool(writer.write, chunk)
+            hashes[safe_name] = await run_in_threadpool(writer.commit)
 
             filenames.append(safe_name)
             saved += 1
-            logger.info(f"Uploaded file: {safe_name} to {path}")
+            logger.info(f"Uploaded file: {safe_name} to {writer.final_path}")
 
         except Exception as e:
+            if writer is not None:
+                await run_in_threadpool(writer.abort)
             errors.append(f"{f.filename or 'unknown'}: {e}")
             logger.error(f"Upload failed for {f.filename or 'unknown'}: {e}")
+        finally:
+            await f.close()
+
+    return {
+        "saved": saved,
+        "filenames": filenames,
+        "errors": errors,
+        "sha256": hashes,
+    }
+
+
+@router.post(
+    "/resumes/upload/zip",
+    response_model=dict,
+    summary="Upload a ZIP of PDFs, extracting it while it streams in",
+)
+async def upload_resumes_zip(
+    request: Request,
+    job_id: str = Query(..., examples=["769a7894"]),
+    process: bool = Query(
+        False, description="Parse PDFs as they arrive and queue a processing task"
+    ),
+    force: bool = Query(False, description="Passed to the processing task"),
+):
+    """
+    Bulk upload: the request body is a raw ZIP archive (Content-Type
+    application/zip). PDFs are written to the job folder member by member as
+    bytes arrive; directories inside the archive are flattened and non-PDF
+    members skipped. Compression ratio, total size and member count limits are
+    checked while decompressing; a violation stops the upload but keeps the
+    files already written. With process=true every extracted PDF starts parsing
+    right away and a processing task is queued once the archive is read.
+    """
+    if not job_id:
+        raise HTTPException(status_code=422, detail="job_id is required")
 
-    return {"saved": saved, "filenames": filenames, "errors": errors}
+    dest = ensure_job_dir(job_id)
+    saved, filenames, errors, hashes = 0, [], [], {}
+    budget = ByteBudget(UPLOAD_MAX_REQUEST_BYTES)
+    reader = ZipStreamReader(request.stream())
+
+    try:
+        async for member in reader.members_iter():
+            safe_name = safe_member_filename(member.name)
+            if safe_name is None:
+                if not member.name.endswith("/"):
+                    errors.append(f"{member.name}: not a PDF, skipped")
+                continue
+            if safe_name in hashes:
+                errors.append(f"{member.name}: duplicate name {safe_name}, skipped")
+                continue
+            # Disk writes and the fsync run off the event loop
+            writer = await run_in_threadpool(
+                AtomicPdfWriter, dest, safe_name, UPLOAD_MAX_FILE_BYTES, budget
+            )
+            try:
+                async for chunk in member.chunks():
+                    await run_in_threadpool(writer.write, chunk)
+                hashes[safe_name] = await run_in_threadpool(writer.commit)
+            except UploadRejected as e:
+                await run_in_threadpool(writer.abort)
+                # Archive-level limits (and truncation) stop the whole upload
+                if isinstance(e, ZipRejected) or budget.exhausted:
+                    raise
+                errors.append(f"{member.name}: {e}")
+                await member.skip()
+                continue
+            except BaseException:
+                # Also reached on cancellation, where awaiting is not possible
+                writer.abort()
+                raise
+
+            filenames.append(safe_name)
+            saved += 1
+            logger.info(f"Extracted {member.name} to {writer.final_path}")
+            if process:
+                prewarm_parse(job_id, str(writer.final_path), hashes[safe_name])
+    except UploadRejected as e:
+        errors.append(f"archive: {e}")
+        logger.error(f"ZIP upload for job_id {job_id} stopped: {e}")
+
+    response = {
+        "saved": saved,
+        "filenames": filenames,
+        "errors": errors,
+        "sha256": hashes,
+        "members": reader.members,
+        "uncompressed_bytes": reader.total_uncompressed,
+    }
+    if process and saved:
+        response["task_id"] = task_runner.submit(
+            PROCESS_TASK_KIND, {"job_id": job_id, "force": force}
+        )
+        response["status"] = STATUS_QUEUED
+    return response
 
 
 @router.get(
@@ -533,6 +1477,17 @@ def delete_uploaded_file(
 class ProcessRequest(BaseModel):
     job_id: str
     files: Optional[List[str]] = []
+    force: bool = Field(
+        False, description="Reprocess every PDF, even ones already inserted"
+    )
+    timings: bool = Field(
+        False, description="Include a per-stage timing breakdown in the response"
+    )
+    extraction_mode: Literal["two_call", "combined"] = Field(
+        DEFAULT_EXTRACTION_MODE,
+        description="'two_call': extraction then summary; 'combined': one LLM call "
+        "returns the profile and resume_summary together",
+    )
 
 @router.post(
     "/resumes/process",
@@ -556,75 +1511,148 @@ def process_resumes(request: ProcessRequest):
         )
 
     try:
-        # Process all PDFs in the folder (following original script logic)
-        candidates = process_folder(folder_path, job_id)
-        print(f"\n Parsed {len(candidates)} candidates")
-
-        # Insert candidates to Weaviate (following original script logic)
-        client = weaviate.connect_to_weaviate_cloud(
-            cluster_url=os.getenv("WEAVIATE_URL"),
-            auth_credentials=weaviate.auth.AuthApiKey(os.getenv("WEAVIATE_API_KEY")),
+        return ingest_job(
+            job_id,
+            force=request.force,
+            include_timings=request.timings,
+            extraction_mode=request.extraction_mode,
         )
 
-        errors = []
-        inserted = 0
+    except Exception as e:
+        logger.error(f"Processing failed for job_id {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
-        try:
-            cand = client.collections.get("Candidate")
-
-            for idx, item in enumerate(candidates):
-                try:
-                    properties = {
-                        "name": item.get("name"),
-                        "email": item.get("email"),
-                        "age": item.get("age"),
-                        "skills": item.get("skills") or [],
-                        "years_of_experience": item.get("years_of_experience"),
-                        "highest_education": item.get("highest_education"),
-                        "current_role": item.get("current_role"),
-                        "function": item.get("function"),
-                        "resume_summary": item.get("resume_summary"),
-                        "education": map_education(item.get("education")),
-                        "experience": map_experience(item.get("experience")),
-                        "projects": map_projects(item.get("projects")),
-                        "job_id": item.get("job_id"),
-                        "social_links": item.get("social_links") or [],
-                        "candidate_id": item.get("candidate_id"),
-                    }
-
-                    # vector for this candidate
-                    resume_vec = item.get("resume_summary_vector")
-                    if not resume_vec:
-                        error_msg = (
-                            f"Candidate {idx} missing resume_summary_vector. Skipped."
-                        )
-                        print(f"⚠️ {error_msg}")
-                        errors.append(error_msg)
-                        continue
-
-                    # insert into Weaviate
-                    obj_id = cand.data.insert(
-                        properties=properties,
-                        vector=resume_vec,  # default vector space
-                    )
-                    print(f"✅ Inserted candidate[{idx}] with UUID: {obj_id}")
-                    inserted += 1
 
-                except Exception as e:
-                    error_msg = f"Error inserting candidate[{idx}]: {e}"
-                    print(f"❌ {error_msg}")
-                    errors.append(error_msg)
+@router.post(
+    "/resumes/process/stream",
+    summary="Parse, summarize & insert candidates, streaming NDJSON progress events",
+)
+def process_resumes_stream(request: ProcessRequest):
+    """
+    Same work as /resumes/process, but streams one JSON line per event as each PDF
+    finishes parsing, extraction, summary, embedding and the Weaviate insert.
+    Insert events carry the candidate so the client can render it right away;
+    the last line is the usual /resumes/process response (type "result") or an
+    error (type "error").
+    """
+    job_id = request.job_id
+    if not job_id:
+        raise HTTPException(status_code=422, detail="job_id is required")
+    if not os.path.isdir(os.path.join(UPLOAD_ROOT, job_id)):
+        raise HTTPException(
+            status_code=404, detail=f"No upload folder found for job_id {job_id}"
+        )
 
+    events: "queue.Queue[Optional[dict]]" = queue.Queue()
+    started = time.perf_counter()
+
+    def on_file_event(filename, stage, status, error, seconds, payload=None):
+        event = {
+            "type": "file",
+            "filename": filename,
+            "stage": stage,
+            "status": status,
+            "error": error,
+            "stage_seconds": round(seconds, 4),
+            "elapsed_seconds": round(time.perf_counter() - started, 4),
+        }
+        if payload is not None:
+            event["candidate"] = payload
+        events.put(event)
+
+    def worker():
+        try:
+            result = ingest_job(
+                job_id,
+                force=request.force,
+                on_file_event=on_file_event,
+                include_timings=request.timings,
+                extraction_mode=request.extraction_mode,
+            )
+            events.put({"type": "result", **result})
+        except Exception as e:
+            logger.error(f"Processing failed for job_id {job_id}: {str(e)}")
+            events.put({"type": "error", "detail": f"Processing failed: {str(e)}"})
         finally:
-            client.close()
+            events.put(None)
+
+    # The batch keeps running if the client disconnects; the manifest records it
+    threading.Thread(target=worker, name=f"process-{job_id}", daemon=True).start()
+
+    def stream():
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            yield json.dumps(event, default=str) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/resumes/cache/stats", response_model=dict, summary="Resume processing cache stats"
+)
+def resume_cache_stats():
+    return {"parse_cache": parse_cache.stats(), "llm_cache": llm_cache.stats()}
+
+
+@router.get(
+    "/resumes/timings/stats",
+    response_model=dict,
+    summary="Latency histograms (p50/p95/p99) of every resume processing stage",
+)
+def resume_timing_stats():
+    return {"stages": stage_histograms.snapshot()}
+
+
+@router.post(
+    "/resumes/process/tasks",
+    response_model=dict,
+    summary="Queue resume processing as a background task",
+)
+def submit_process_task(request: ProcessRequest):
+    """Queue processing of a job's uploaded PDFs and return a task id immediately"""
+    job_id = request.job_id
+    if not job_id:
+        raise HTTPException(status_code=422, detail="job_id is required")
+    if not os.path.isdir(os.path.join(UPLOAD_ROOT, job_id)):
+        raise HTTPException(
+            status_code=404, detail=f"No upload folder found for job_id {job_id}"
+        )
 
-        return {
+    task_id = task_runner.submit(
+        PROCESS_TASK_KIND,
+        {
             "job_id": job_id,
-            "total_candidates": len(candidates),
-            "inserted": inserted,
-            "errors": errors,
-        }
+            "force": request.force,
+            "timings": request.timings,
+            "extraction_mode": request.extraction_mode,
+        },
+    )
+    return {"task_id": task_id, "status": STATUS_QUEUED}
 
-    except Exception as e:
-        logger.error(f"Processing failed for job_id {job_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+
+@router.get(
+    "/resumes/process/tasks/{task_id}",
+    response_model=dict,
+    summary="Status, per-file stage, counts and errors of a processing task",
+)
+def get_process_task(task_id: str):
+    task = task_store.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+
+@router.post(
+    "/resumes/process/tasks/{task_id}/cancel",
+    response_model=dict,
+    summary="Cancel a queued or running processing task",
+)
+def cancel_process_task(task_id: str):
+    if task_store.get(task_id) is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not task_store.request_cancel(task_id):
+        raise HTTPException(status_code=409, detail="Task already finished")
+    logger.info(f"Cancellation requested for task {task_id}")
+    return {"task_id": task_id, "cancel_requested": True}
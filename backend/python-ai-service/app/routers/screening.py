@@ -1,21 +1,54 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, conint
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import os
+import math
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
 from dotenv import load_dotenv
 import weaviate
 from weaviate.classes.query import Filter, MetadataQuery, HybridFusion
 from weaviate.classes.init import AdditionalConfig, Timeout
-from sentence_transformers import SentenceTransformer
 from google import genai
 import json
+import hashlib
 import logging
+from datetime import datetime, timezone
+
+from app.services.context_cache import (
+    CONTEXT_CACHE_ENABLED,
+    CachedContext,
+    GeminiContext,
+)
+from app.services.evaluation_cache import evaluation_cache, invalidate_job, job_prefix
+from app.services.fast_filter import (
+    FAST_FILTER_THRESHOLD,
+    parse_job_requirements,
+    score_candidate,
+)
+from app.services.local_cache import LocalCache
 
 load_dotenv()
 router = APIRouter(tags=["screening"])
 logger = logging.getLogger(__name__)
 
-st = SentenceTransformer("all-mpnet-base-v2")
+# Parallel Gemini evaluations per screening run, and the limit for each call
+SCREENING_CONCURRENCY = int(os.getenv("SCREENING_CONCURRENCY", "8"))
+SCREENING_EVAL_TIMEOUT_SECONDS = float(
+    os.getenv("SCREENING_EVAL_TIMEOUT_SECONDS", "60")
+)
+# Candidates per evaluation call; 1 keeps one Gemini call per candidate
+SCREENING_BATCH_SIZE = int(os.getenv("SCREENING_BATCH_SIZE", "1"))
+
+# Funnel counts of the latest screening run per job, for /screening/summary
+screening_runs = LocalCache(
+    os.getenv("SCREENING_RUNS_PATH", "./data/screening_runs.sqlite3"),
+    max_bytes=8 * 1024 * 1024,
+    name="screening_runs",
+)
 
 # ----- Pydantic models -----
 Score = conint(ge=1, le=10)
@@ -54,6 +87,14 @@ class CandidateEvaluation(BaseModel):
     )
 
 
+class KeyedCandidateEvaluation(CandidateEvaluation):
+    candidate_id: str
+
+
+class BatchEvaluation(BaseModel):
+    evaluations: List[KeyedCandidateEvaluation]
+
+
 class ScreeningRequest(BaseModel):
     job_id: str = Field(..., examples=["769a7894"])
     top_k: conint(ge=1, le=200) = Field(30, description="Pool size for hybrid search")
@@ -68,6 +109,212 @@ class ScreeningRequest(BaseModel):
         5,
         description="Maximum candidates to process when search_all_candidates=True (hardcoded safety limit)",
     )
+    fast_filter: bool = Field(
+        False,
+        description="Pre-screen search hits locally and only send those scoring at least fast_filter_threshold to the LLM",
+    )
+    fast_filter_threshold: float = Field(
+        FAST_FILTER_THRESHOLD,
+        ge=0,
+        le=100,
+        description="Minimum fast-filter score (0-100) to reach LLM evaluation",
+    )
+    evaluation_batch_size: conint(ge=1, le=20) = Field(
+        SCREENING_BATCH_SIZE,
+        description="Candidates evaluated per Gemini call; job description and rubric are sent once per batch",
+    )
+    context_cache: bool = Field(
+        CONTEXT_CACHE_ENABLED,
+        description="Register the job description and rubric once per run as Gemini cached context (single-candidate evaluation only)",
+    )
+
+
+EVALUATION_MODEL = "gemini-2.5-flash"
+# Rubric pieces shared by the single and batched prompts
+EVALUATION_CRITERIA = """        ## Criteria & guidance (score each 1–10)
+        A. Years of experience & seniority alignment  
+        - Map total relevant YOE vs. JD requirement.   
+        - Consider depth in core areas, not just total years.
+
+        B. Skills match (hard skills)  
+        - Count how many essential and nice‑to‑have skills are satisfied.  
+        - Penalize missing essentials more than missing "nice‑to‑haves".
+
+        C. Industry / domain relevance & project fit  
+        - Similar products, tech stack, domain, or customer segment.  
+        - Prefer recent, hands‑on, outcome‑driven work.
+
+        D. Achievements & certifications  
+        - Concrete outcomes (metrics), notable awards, relevant certs.  
+        - Prefer measurable impact (e.g., "↑CTR 12%", "↓latency 35%").
+
+        E. Education alignment (bonus criterion)  
+        - Degree relevance, advanced study, coursework that maps to JD.
+
+"""
+EVALUATION_SCORING_RULES = """        - All scores are integers 1–10.
+        - Include short evidence lists (quotes or paraphrases) per criterion.
+        - Provide `matched_skills`, `missing_essential_skills`, `nice_to_have_matched`.
+        3.Also compute an overall score (0–100) using weights:
+        - Years/Seniority 20%
+        - Skills 30%
+        - Industry/Project fit 30%
+        - Achievements/Certs 15%
+        - Education 5%
+        Round to nearest integer, and include a one‑paragraph `summary`.
+"""
+EVALUATION_PROMPT_TEMPLATE = (
+    """
+        You are a meticulous technical recruiter assessing a candidate's resume against a specific job description.
+
+        ## Inputs
+        JOB DESCRIPTION:
+        {job_desc}
+
+        CANDIDATE RESUME:
+        {resume_json}
+
+        ## What to do
+        1) Read both carefully. When the job description lists "must-have" items, treat them as essential.
+        2) Evaluate the candidate on each criterion below, score 1–10 (1 = very poor, 10 = exceptional), and explain briefly with evidence (short quotes or bullet references).
+        3) If a criterion doesn't apply (e.g., no certifications are relevant), still score it based on available signals and explain why.
+
+"""
+    + EVALUATION_CRITERIA
+    + """        ## Output format (STRICT)
+        1.Provide a structured JSON response strictly adhering to this schema:
+        ```json
+        {schema}
+        ```json
+        2.Return ONLY valid JSON matching this schema:
+"""
+    + EVALUATION_SCORING_RULES
+    + """        4.Please remove any ```json ``` characters from the output. 
+        """
+)
+# N candidates per call: job description and rubric are sent once per batch
+BATCH_EVALUATION_PROMPT_TEMPLATE = (
+    """
+        You are a meticulous technical recruiter assessing several candidates' resumes against a specific job description.
+
+        ## Inputs
+        JOB DESCRIPTION:
+        {job_desc}
+
+        CANDIDATE RESUMES (JSON list, each with its `candidate_id`):
+        {resumes_json}
+
+        ## What to do
+        1) Read the job description and each resume carefully. When the job description lists "must-have" items, treat them as essential.
+        2) Evaluate every candidate independently on each criterion below, score 1–10 (1 = very poor, 10 = exceptional), and explain briefly with evidence (short quotes or bullet references). Do not compare candidates with each other.
+        3) If a criterion doesn't apply (e.g., no certifications are relevant), still score it based on available signals and explain why.
+
+"""
+    + EVALUATION_CRITERIA
+    + """        ## Output format (STRICT)
+        1.Provide a structured JSON response strictly adhering to this schema, with exactly one entry in `evaluations` per candidate, carrying that candidate's `candidate_id`:
+        ```json
+        {schema}
+        ```json
+        2.Return ONLY valid JSON matching this schema:
+"""
+    + EVALUATION_SCORING_RULES
+    + """        4.Please remove any ```json ``` characters from the output.
+        """
+)
+# Same rubric with the resume last, so everything before it is one prefix that
+# is registered once per run as cached context (see open_evaluation_context)
+CONTEXT_EVALUATION_PREFIX_TEMPLATE = (
+    """
+        You are a meticulous technical recruiter assessing a candidate's resume against a specific job description.
+        The candidate's resume follows after these instructions.
+
+        ## Inputs
+        JOB DESCRIPTION:
+        {job_desc}
+
+        ## What to do
+        1) Read both carefully. When the job description lists "must-have" items, treat them as essential.
+        2) Evaluate the candidate on each criterion below, score 1–10 (1 = very poor, 10 = exceptional), and explain briefly with evidence (short quotes or bullet references).
+        3) If a criterion doesn't apply (e.g., no certifications are relevant), still score it based on available signals and explain why.
+
+"""
+    + EVALUATION_CRITERIA
+    + """        ## Output format (STRICT)
+        1.Provide a structured JSON response strictly adhering to this schema:
+        ```json
+        {schema}
+        ```json
+        2.Return ONLY valid JSON matching this schema:
+"""
+    + EVALUATION_SCORING_RULES
+    + """        4.Please remove any ```json ``` characters from the output.
+"""
+)
+CONTEXT_EVALUATION_RESUME_TEMPLATE = """
+        CANDIDATE RESUME:
+        {resume_json}
+        """
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Part of every evaluation cache key, so editing the prompt or the
+# CandidateEvaluation model never serves stale evaluations
+EVALUATION_PROMPT_VERSION = _sha256(EVALUATION_PROMPT_TEMPLATE)[:12]
+BATCH_EVALUATION_PROMPT_VERSION = _sha256(BATCH_EVALUATION_PROMPT_TEMPLATE)[:12]
+CONTEXT_EVALUATION_PROMPT_VERSION = _sha256(
+    CONTEXT_EVALUATION_PREFIX_TEMPLATE + CONTEXT_EVALUATION_RESUME_TEMPLATE
+)[:12]
+EVALUATION_SCHEMA_HASH = _sha256(
+    json.dumps(CandidateEvaluation.model_json_schema(), sort_keys=True)
+)[:12]
+
+
+def evaluation_cache_key(
+    job_id: str,
+    candidate_id: str,
+    job_desc: str,
+    prompt_version: str = EVALUATION_PROMPT_VERSION,
+) -> str:
+    """(candidate, job description hash, model, prompt version, schema hash) key"""
+    return job_prefix(job_id) + ":".join(
+        [
+            candidate_id,
+            _sha256(job_desc),
+            EVALUATION_MODEL,
+            prompt_version,
+            EVALUATION_SCHEMA_HASH,
+        ]
+    )
+
+
+class LLMUsage:
+    def __init__(self):
+        """Thread-safe token and call counters from Gemini usage metadata"""
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, response) -> None:
+        meta = getattr(response, "usage_metadata", None)
+        with self._lock:
+            self.calls += 1
+            if meta is not None:
+                self.prompt_tokens += meta.prompt_token_count or 0
+                self.output_tokens += meta.candidates_token_count or 0
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+                "total_tokens": self.prompt_tokens + self.output_tokens,
+            }
 
 
 # ----- Helper functions -----
@@ -165,6 +412,7 @@ def hybrid_search_applied_candidates(
                 "projects": obj.properties["projects"],
                 "years_of_experience": obj.properties["years_of_experience"],
                 "education": obj.properties["education"],
+                "highest_education": obj.properties.get("highest_education"),
                 "applied_to_job": True,  # Mark as applied
             }
             candidates.append(candidate)
@@ -219,6 +467,7 @@ def hybrid_search_all_candidates(
                 "projects": obj.properties["projects"],
                 "years_of_experience": obj.properties["years_of_experience"],
                 "education": obj.properties["education"],
+                "highest_education": obj.properties.get("highest_education"),
                 "applied_to_job": applied_to_job,  # Mark whether they applied
                 "original_job_id": obj.properties.get(
                     "job_id"
@@ -237,91 +486,422 @@ def hybrid_search_all_candidates(
         client.close()
 
 
-def evaluate_candidate(resume_json: Dict, job_desc: str) -> Dict:
+def evaluation_context_prefix(job_desc: str) -> str:
+    """Job description and rubric: everything of the context prompt but the resume"""
+    return CONTEXT_EVALUATION_PREFIX_TEMPLATE.format(
+        job_desc=job_desc, schema=CandidateEvaluation.model_json_schema()
+    )
+
+
+def open_evaluation_context(
+    job_id: str, job_desc: str, provider_cache: bool
+) -> CachedContext:
+    """
+    Evaluation context for one screening run. provider_cache registers the
+    prefix with Gemini; without it calls send the same prompt in full.
+    """
+    return GeminiContext(
+        EVALUATION_MODEL,
+        evaluation_context_prefix(job_desc),
+        timeout_seconds=SCREENING_EVAL_TIMEOUT_SECONDS,
+        display_name=f"screening-{job_id}",
+        enabled=provider_cache,
+    )
+
+
+# open_context(job_id, job_desc, provider_cache) of screen_job
+ContextFactory = Callable[[str, str, bool], CachedContext]
+
+
+def evaluate_candidate(
+    resume_json: Dict,
+    job_desc: str,
+    usage: Optional[LLMUsage] = None,
+    context: Optional[CachedContext] = None,
+) -> Dict:
+    """
+    With a context (see open_evaluation_context) only the resume is sent; the
+    job description and rubric come from the context
+    """
     try:
         logger.info(f"Starting evaluation for candidate {resume_json.get('name')}")
-        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
         # Convert resume_json to JSON string with proper datetime handling
         # This is the key fix - use json.dumps with default=str to handle datetime objects
         resume_json_str = json.dumps(resume_json, ensure_ascii=False, default=str)
 
-        prompt = f"""
-        You are a meticulous technical recruiter assessing a candidate's resume against a specific job description.
+        config = {
+            "response_mime_type": "application/json",
+            "response_schema": CandidateEvaluation,
+        }
+        if context is not None:
+            response = context.generate(
+                CONTEXT_EVALUATION_RESUME_TEMPLATE.format(resume_json=resume_json_str),
+                config,
+            )
+        else:
+            client = genai.Client(
+                api_key=os.getenv("GEMINI_API_KEY"),
+                http_options={"timeout": int(SCREENING_EVAL_TIMEOUT_SECONDS * 1000)},
+            )
+            prompt = EVALUATION_PROMPT_TEMPLATE.format(
+                job_desc=job_desc,
+                resume_json=resume_json_str,
+                schema=CandidateEvaluation.model_json_schema(),
+            )
+            response = client.models.generate_content(
+                model=EVALUATION_MODEL, contents=prompt, config=config
+            )
 
-        ## Inputs
-        JOB DESCRIPTION:
-        {job_desc}
+        if usage is not None:
+            usage.add(response)
+        if not response or not response.text:
+            raise ValueError("Failed to get a response from LLM.")
 
-        CANDIDATE RESUME:
-        {resume_json_str}
+        logger.info(f"Successfully evaluated candidate {resume_json.get('name')}")
+        return json.loads(response.text)
+    except Exception as e:
+        logger.error(
+            f"Failed to evaluate candidate {resume_json.get('name')}: {str(e)}"
+        )
+        raise
 
-        ## What to do
-        1) Read both carefully. When the job description lists "must-have" items, treat them as essential.
-        2) Evaluate the candidate on each criterion below, score 1–10 (1 = very poor, 10 = exceptional), and explain briefly with evidence (short quotes or bullet references).
-        3) If a criterion doesn't apply (e.g., no certifications are relevant), still score it based on available signals and explain why.
 
-        ## Criteria & guidance (score each 1–10)
-        A. Years of experience & seniority alignment  
-        - Map total relevant YOE vs. JD requirement.   
-        - Consider depth in core areas, not just total years.
+def evaluate_candidate_batch(
+    resumes: Dict[str, Dict], job_desc: str, usage: Optional[LLMUsage] = None
+) -> Dict[str, Dict]:
+    """
+    Evaluate several candidates in one LLM call.
 
-        B. Skills match (hard skills)  
-        - Count how many essential and nice‑to‑have skills are satisfied.  
-        - Penalize missing essentials more than missing "nice‑to‑haves".
+    Args:
+        resumes: candidate_id -> resume_json
+    Returns:
+        candidate_id -> evaluation for every entry that came back valid; the
+        caller falls back to evaluate_candidate for the rest
+    """
+    logger.info(f"Starting batched evaluation of {len(resumes)} candidates")
+    client = genai.Client(
+        api_key=os.getenv("GEMINI_API_KEY"),
+        http_options={
+            "timeout": int(SCREENING_EVAL_TIMEOUT_SECONDS * len(resumes) * 1000)
+        },
+    )
+    resumes_json = json.dumps(
+        [{"candidate_id": cid, **resume} for cid, resume in resumes.items()],
+        ensure_ascii=False,
+        default=str,
+    )
+    prompt = BATCH_EVALUATION_PROMPT_TEMPLATE.format(
+        job_desc=job_desc,
+        resumes_json=resumes_json,
+        schema=BatchEvaluation.model_json_schema(),
+    )
+    response = client.models.generate_content(
+        model=EVALUATION_MODEL,
+        contents=prompt,
+        config={
+            "response_mime_type": "application/json",
+            "response_schema": BatchEvaluation,
+        },
+    )
+    if usage is not None:
+        usage.add(response)
+    if not response or not response.text:
+        raise ValueError("Failed to get a response from LLM.")
 
-        C. Industry / domain relevance & project fit  
-        - Similar products, tech stack, domain, or customer segment.  
-        - Prefer recent, hands‑on, outcome‑driven work.
+    evaluations: Dict[str, Dict] = {}
+    for entry in json.loads(response.text).get("evaluations") or []:
+        cid = entry.pop("candidate_id", None) if isinstance(entry, dict) else None
+        if cid not in resumes or cid in evaluations:
+            continue
+        try:
+            # Validated one by one so a single bad entry only costs its own retry
+            evaluations[cid] = CandidateEvaluation.model_validate(entry).model_dump()
+        except Exception as e:
+            logger.warning(f"Invalid batched evaluation for candidate {cid}: {e}")
+    logger.info(
+        f"Batched evaluation returned {len(evaluations)} of {len(resumes)} candidates"
+    )
+    return evaluations
 
-        D. Achievements & certifications  
-        - Concrete outcomes (metrics), notable awards, relevant certs.  
-        - Prefer measurable impact (e.g., "↑CTR 12%", "↓latency 35%").
 
-        E. Education alignment (bonus criterion)  
-        - Degree relevance, advanced study, coursework that maps to JD.
+def resume_for_evaluation(candidate: Dict) -> Dict:
+    return {
+        "name": candidate["name"],
+        "skills": candidate["skills"],
+        "resume_summary": candidate["resume_summary"],
+        "experience": candidate["experience"],
+        "projects": candidate["projects"],
+        "years_of_experience": candidate["years_of_experience"],
+        "education": candidate["education"],
+    }
 
-        ## Output format (STRICT)
-        1.Provide a structured JSON response strictly adhering to this schema:
-        ```json
-        {CandidateEvaluation.model_json_schema()}
-        ```json
-        2.Return ONLY valid JSON matching this schema:
-        - All scores are integers 1–10.
-        - Include short evidence lists (quotes or paraphrases) per criterion.
-        - Provide `matched_skills`, `missing_essential_skills`, `nice_to_have_matched`.
-        3.Also compute an overall score (0–100) using weights:
-        - Years/Seniority 20%
-        - Skills 30%
-        - Industry/Project fit 30%
-        - Achievements/Certs 15%
-        - Education 5%
-        Round to nearest integer, and include a one‑paragraph `summary`.
-        4.Please remove any ```json ``` characters from the output. 
-        """
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": CandidateEvaluation,
-            },
+
+def cached_evaluation(
+    candidate: Dict,
+    job_desc: str,
+    job_id: str,
+    context: Optional[CachedContext] = None,
+) -> Tuple[Dict, bool]:
+    """(evaluation, served from cache) of one search hit, single-call prompt"""
+    cache_key = evaluation_cache_key(
+        job_id,
+        candidate["candidate_id"],
+        job_desc,
+        CONTEXT_EVALUATION_PROMPT_VERSION if context else EVALUATION_PROMPT_VERSION,
+    )
+    cached = evaluation_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using cached evaluation for {candidate['candidate_id']}")
+        evaluation = json.loads(cached)
+    else:
+        evaluation = evaluate_candidate(
+            resume_for_evaluation(candidate), job_desc, context=context
         )
+        evaluation_cache.put(cache_key, json.dumps(evaluation))
+    return evaluation, cached is not None
 
-        if not response or not response.text:
-            raise ValueError("Failed to get a response from LLM.")
 
-        logger.info(f"Successfully evaluated candidate {resume_json.get('name')}")
-        return json.loads(response.text)
+def screen_candidate(
+    candidate: Dict,
+    job_desc: str,
+    job_id: str,
+    context: Optional[CachedContext] = None,
+) -> Dict:
+    """Evaluate one search hit against the job and build its result entry"""
+    evaluation, cached = cached_evaluation(candidate, job_desc, job_id, context)
+    return candidate_entry(candidate, evaluation, cached, job_id)
+
+
+def screen_batch(
+    batch: List[Dict], job_desc: str, job_id: str
+) -> List[Tuple[Optional[Dict], Optional[Exception]]]:
+    """
+    Batched counterpart of screen_candidate: cache hits are served directly, the
+    misses are evaluated in one call, and entries missing or invalid in the
+    batched response fall back to single-candidate calls.
+    Returns:
+      - (entry, error) per candidate, in batch order
+    """
+    keys = [
+        evaluation_cache_key(
+            job_id, c["candidate_id"], job_desc, BATCH_EVALUATION_PROMPT_VERSION
+        )
+        for c in batch
+    ]
+    cached = [evaluation_cache.get(key) for key in keys]
+    evaluations: Dict[str, Dict] = {
+        c["candidate_id"]: json.loads(hit)
+        for c, hit in zip(batch, cached)
+        if hit is not None
+    }
+    misses = {
+        c["candidate_id"]: resume_for_evaluation(c)
+        for c, hit in zip(batch, cached)
+        if hit is None
+    }
+    if misses:
+        try:
+            fresh = evaluate_candidate_batch(misses, job_desc)
+        except Exception as e:
+            logger.error(f"Batched evaluation failed, falling back: {str(e)}")
+            fresh = {}
+        for cid, evaluation in fresh.items():
+            evaluations[cid] = evaluation
+        for candidate, key in zip(batch, keys):
+            if candidate["candidate_id"] in fresh:
+                evaluation_cache.put(key, json.dumps(fresh[candidate["candidate_id"]]))
+
+    results: List[Tuple[Optional[Dict], Optional[Exception]]] = []
+    for candidate, key, hit in zip(batch, keys, cached):
+        cid = candidate["candidate_id"]
+        try:
+            if cid in evaluations:
+                entry = candidate_entry(candidate, evaluations[cid], hit is not None, job_id)
+            else:
+                logger.info(f"Falling back to single evaluation for {cid}")
+                evaluation, from_cache = cached_evaluation(candidate, job_desc, job_id)
+                # Later batched runs look it up under the batch key
+                evaluation_cache.put(key, json.dumps(evaluation))
+                entry = candidate_entry(candidate, evaluation, from_cache, job_id)
+            results.append((entry, None))
+        except Exception as e:
+            results.append((None, e))
+    return results
+
+
+def candidate_entry(
+    candidate: Dict, evaluation: Dict, cached: bool, job_id: str
+) -> Dict:
+    """Result entry of an evaluated search hit"""
+    # Fetch original job title if original_job_id exists and differs from job_id
+    original_job_title = None
+    if candidate.get("original_job_id") and candidate["original_job_id"] != job_id:
+        original_job_title = fetch_job_title(candidate["original_job_id"])
+
+    return {
+        "candidate_id": candidate["candidate_id"],
+        "name": candidate["name"],
+        "skills": candidate["skills"],
+        "resume_summary": candidate["resume_summary"],
+        "experience": candidate["experience"],
+        "projects": candidate["projects"],
+        "years_of_experience": candidate["years_of_experience"],
+        "education": candidate["education"],
+        "applied_to_job": candidate.get("applied_to_job", True),
+        "original_job_id": candidate.get("original_job_id"),
+        "original_job_title": original_job_title,  # Add the job title
+        "evaluation": evaluation,
+        "evaluation_cached": cached,
+        "fast_filter": candidate.get("fast_filter"),
+    }
+
+
+def fast_filter_candidates(
+    candidates: List[Dict], job_desc: str, threshold: float
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Score candidates locally against the job's stated requirements.
+    Returns:
+      - (passed, filtered out); each candidate gets its "fast_filter" breakdown
+    """
+    requirements = parse_job_requirements(job_desc)
+    logger.info(f"Fast filter requirements: {requirements}")
+    passed, filtered = [], []
+    for candidate in candidates:
+        candidate["fast_filter"] = score_candidate(candidate, requirements)
+        if candidate["fast_filter"]["score"] >= threshold:
+            passed.append(candidate)
+        else:
+            filtered.append(candidate)
+    logger.info(
+        f"Fast filter passed {len(passed)} of {len(candidates)} candidates "
+        f"(threshold {threshold})"
+    )
+    return passed, filtered
+
+
+def record_funnel(job_id: str, funnel: Dict[str, Any]) -> None:
+    try:
+        screening_runs.put(f"funnel:{job_id}", json.dumps(funnel))
     except Exception as e:
+        logger.error(f"Failed to record screening funnel for job_id {job_id}: {e}")
+
+
+def evaluate_candidates(
+    candidates: List[Dict],
+    job_desc: str,
+    job_id: str,
+    concurrency: int = SCREENING_CONCURRENCY,
+    timeout: float = SCREENING_EVAL_TIMEOUT_SECONDS,
+    on_result: Optional[Callable[[Dict], None]] = None,
+    batch_size: int = SCREENING_BATCH_SIZE,
+    context: Optional[CachedContext] = None,
+) -> List[Dict]:
+    """
+    Evaluate candidates in parallel (at most `concurrency` Gemini calls at once),
+    collecting results as they complete; on_result(entry) is called for each.
+    With batch_size > 1 each call evaluates up to batch_size candidates (see
+    screen_batch). A context replaces the job description and rubric of
+    single-candidate calls. Candidates whose evaluation fails or times out are
+    skipped.
+    Returns the evaluated entries in search-rank order.
+    """
+    if not candidates:
+        return []
+    batch_size = max(1, batch_size)
+
+    def run_unit(positions: List[int]):
+        batch = [candidates[idx - 1] for idx in positions]
+        if batch_size == 1:
+            return [(screen_candidate(batch[0], job_desc, job_id, context), None)]
+        return screen_batch(batch, job_desc, job_id)
+
+    results: List[Tuple[int, Dict]] = []
+    pool = ThreadPoolExecutor(
+        max_workers=max(1, concurrency), thread_name_prefix="screening"
+    )
+    positions = list(range(1, len(candidates) + 1))
+    futures = {
+        pool.submit(run_unit, unit): unit
+        for unit in (
+            positions[i : i + batch_size]
+            for i in range(0, len(positions), batch_size)
+        )
+    }
+    # Calls time out on their own; this only guards against a stuck worker.
+    # A batch call gets batch_size * timeout and may then fall back to one call
+    # per candidate.
+    unit_timeout = timeout if batch_size == 1 else 2 * batch_size * timeout
+    waves = math.ceil(len(futures) / max(1, concurrency))
+    deadline = waves * unit_timeout + 5
+    try:
+        for fut in as_completed(futures, timeout=deadline):
+            unit = futures[fut]
+            try:
+                outcomes = fut.result()
+            except Exception as e:
+                outcomes = [(None, e)] * len(unit)
+            for idx, (entry, error) in zip(unit, outcomes):
+                candidate = candidates[idx - 1]
+                if error is not None:
+                    logger.error(
+                        f"Evaluation failed for candidate {candidate['candidate_id']}: {str(error)}"
+                    )
+                    continue
+                results.append((idx, entry))
+                if on_result:
+                    on_result(entry)
+                logger.info(
+                    f"Evaluated candidate {candidate['candidate_id']} at position {idx} (applied: {candidate.get('applied_to_job', 'unknown')})"
+                )
+    except TimeoutError:
+        pending = [idx for f, unit in futures.items() if not f.done() for idx in unit]
         logger.error(
-            f"Failed to evaluate candidate {resume_json.get('name')}: {str(e)}"
+            f"Evaluation timed out for {len(pending)} candidates at positions {pending}"
         )
-        raise
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
+    results.sort(key=lambda r: r[0])
+    return [entry for _, entry in results]
 
-@router.post("/screening/run", response_model=dict)
-def run_screening(req: ScreeningRequest):
+
+def load_job(job_id: str) -> Tuple[str, List[float]]:
+    job_desc, job_vec = fetch_job_description(job_id)
+    if not job_desc or not job_vec:
+        logger.error(f"Job not found for job_id {job_id}")
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_desc, job_vec
+
+
+def pool_entry(candidate: Dict, evaluate: bool) -> Dict:
+    """Light view of a search hit for the streaming pool event"""
+    return {
+        "candidate_id": candidate["candidate_id"],
+        "name": candidate["name"],
+        "skills": candidate["skills"],
+        "years_of_experience": candidate["years_of_experience"],
+        "applied_to_job": candidate.get("applied_to_job", True),
+        "fast_filter": candidate.get("fast_filter"),
+        "will_evaluate": evaluate,
+    }
+
+
+def screen_job(
+    req: ScreeningRequest,
+    job_desc: str,
+    job_vec: List[float],
+    on_event: Optional[Callable[[Dict], None]] = None,
+    open_context: ContextFactory = open_evaluation_context,
+) -> Dict:
+    """
+    Search, fast-filter, evaluate and rank candidates for a job. on_event gets
+    a "pool" event once the pool is known and an "evaluation" event per
+    evaluated candidate as it completes. open_context builds the run's
+    evaluation context when req.context_cache is set (e.g. a LocalContext in
+    tests).
+    """
     job_id = req.job_id
     top_k = req.top_k
     top_k_evaluated = req.top_k_evaluated
@@ -333,11 +913,6 @@ def run_screening(req: ScreeningRequest):
         f"search_all_candidates {search_all_candidates}, max_limit {max_all_candidates_limit}"
     )
 
-    job_desc, job_vec = fetch_job_description(job_id)
-    if not job_desc or not job_vec:
-        logger.error(f"Job not found for job_id {job_id}")
-        raise HTTPException(status_code=404, detail="Job not found")
-
     # Choose search strategy based on request
     if search_all_candidates:
         # Search ALL candidates in database (applied + potential fits)
@@ -350,51 +925,60 @@ def run_screening(req: ScreeningRequest):
         candidates = hybrid_search_applied_candidates(job_desc, job_vec, top_k, job_id)
         search_type = "applied_only"
 
-    evaluated_candidates = []
-    for idx, candidate in enumerate(candidates, start=1):
-        resume_json = {
-            "name": candidate["name"],
-            "skills": candidate["skills"],
-            "resume_summary": candidate["resume_summary"],
-            "experience": candidate["experience"],
-            "projects": candidate["projects"],
-            "years_of_experience": candidate["years_of_experience"],
-            "education": candidate["education"],
-        }
-        try:
-            evaluation = evaluate_candidate(resume_json, job_desc)
-            # Fetch original job title if original_job_id exists and differs from job_id
-            original_job_title = None
-            if (
-                candidate.get("original_job_id")
-                and candidate["original_job_id"] != job_id
-            ):
-                original_job_title = fetch_job_title(candidate["original_job_id"])
-
-            evaluated_candidates.append(
-                {
-                    "candidate_id": candidate["candidate_id"],
-                    "name": candidate["name"],
-                    "skills": candidate["skills"],
-                    "resume_summary": candidate["resume_summary"],
-                    "experience": candidate["experience"],
-                    "projects": candidate["projects"],
-                    "years_of_experience": candidate["years_of_experience"],
-                    "education": candidate["education"],
-                    "applied_to_job": candidate.get("applied_to_job", True),
-                    "original_job_id": candidate.get("original_job_id"),
-                    "original_job_title": original_job_title,  # Add the job title
-                    "evaluation": evaluation,
-                }
-            )
-            logger.info(
-                f"Evaluated candidate {candidate['candidate_id']} at position {idx} (applied: {candidate.get('applied_to_job', 'unknown')})"
-            )
-        except Exception as e:
-            logger.error(
-                f"Evaluation failed for candidate {candidate['candidate_id']}: {str(e)}"
+    if req.fast_filter:
+        to_evaluate, filtered_out = fast_filter_candidates(
+            candidates, job_desc, req.fast_filter_threshold
+        )
+    else:
+        to_evaluate, filtered_out = candidates, []
+
+    if on_event:
+        evaluate_ids = {id(c) for c in to_evaluate}
+        on_event(
+            {
+                "type": "pool",
+                "search_type": search_type,
+                "candidates": [
+                    pool_entry(c, id(c) in evaluate_ids) for c in candidates
+                ],
+                "fast_filter_filtered": len(filtered_out),
+            }
+        )
+
+    def on_evaluation(entry: Dict) -> None:
+        on_event({"type": "evaluation", "candidate": entry})
+
+    # Lives exactly as long as this run's evaluations. The context prompt
+    # layout is used whenever req.context_cache is set, so a candidate/job pair
+    # always has one cache key; the provider cache itself is only created for
+    # at least two evaluations that are not served from the evaluation cache.
+    context = None
+    if req.context_cache and req.evaluation_batch_size == 1:
+        misses = sum(
+            evaluation_cache.get(
+                evaluation_cache_key(
+                    job_id,
+                    c["candidate_id"],
+                    job_desc,
+                    CONTEXT_EVALUATION_PROMPT_VERSION,
+                )
             )
-            continue
+            is None
+            for c in to_evaluate
+        )
+        context = open_context(job_id, job_desc, misses >= 2)
+    try:
+        evaluated_candidates = evaluate_candidates(
+            to_evaluate,
+            job_desc,
+            job_id,
+            on_result=on_evaluation if on_event else None,
+            batch_size=req.evaluation_batch_size,
+            context=context,
+        )
+    finally:
+        if context is not None:
+            context.close()
 
     evaluated_candidates.sort(
         key=lambda x: x["evaluation"].get("overall_score_0_to_100", 0), reverse=True
@@ -410,20 +994,181 @@ def run_screening(req: ScreeningRequest):
         c for c in top_candidates if not c.get("applied_to_job", True)
     ]
 
+    funnel = {
+        "semantic_matched": len(candidates),
+        "fast_filter_processed": len(candidates) if req.fast_filter else 0,
+        "fast_filter_filtered": len(filtered_out),
+        "llm_submitted": len(to_evaluate),
+        "llm_evaluated": len(evaluated_candidates),
+        "fast_filter_threshold": req.fast_filter_threshold if req.fast_filter else None,
+        "search_type": search_type,
+        "run_at": datetime.now(timezone.utc).isoformat(),
+    }
+    record_funnel(job_id, funnel)
+
     return {
         "evaluated": top_candidates,
         "search_type": search_type,
         "stats": {
+            "search_hits": len(candidates),
+            "fast_filter_filtered": len(filtered_out),
             "total_evaluated": len(evaluated_candidates),
             "applied_candidates": len(applied_candidates),
             "potential_candidates": len(potential_candidates),
             "returned_count": len(top_candidates),
+            "cache_hits": sum(c["evaluation_cached"] for c in evaluated_candidates),
+            "context_cache": context.stats() if context else None,
         },
         "applied_candidates": applied_candidates,
         "potential_candidates": potential_candidates,
     }
 
 
+@router.post("/screening/run", response_model=dict)
+def run_screening(req: ScreeningRequest):
+    job_desc, job_vec = load_job(req.job_id)
+    return screen_job(req, job_desc, job_vec)
+
+
+@router.post("/screening/run/stream")
+def run_screening_stream(req: ScreeningRequest):
+    """
+    Same work as /screening/run, streamed as NDJSON: a "pool" line with the
+    hybrid-search pool (and fast-filter verdicts), one "evaluation" line per
+    candidate as soon as Gemini returns, then a "result" line with the usual
+    /screening/run response (sorted top-k and stats), or an "error" line.
+    """
+    job_desc, job_vec = load_job(req.job_id)
+    events: "queue.Queue[Optional[dict]]" = queue.Queue()
+    started = time.perf_counter()
+
+    def on_event(event: Dict) -> None:
+        event["elapsed_seconds"] = round(time.perf_counter() - started, 4)
+        events.put(event)
+
+    def worker():
+        try:
+            result = screen_job(req, job_desc, job_vec, on_event)
+            on_event({"type": "result", **result})
+        except Exception as e:
+            logger.error(f"Screening failed for job_id {req.job_id}: {str(e)}")
+            events.put({"type": "error", "detail": f"Screening failed: {str(e)}"})
+        finally:
+            events.put(None)
+
+    threading.Thread(
+        target=worker, name=f"screening-{req.job_id}", daemon=True
+    ).start()
+
+    def stream():
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            yield json.dumps(event, default=str) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def _benchmark_single(candidates: List[Dict], job_desc: str) -> Dict[str, Any]:
+    usage = LLMUsage()
+    started = time.perf_counter()
+    failed = 0
+    for candidate in candidates:
+        try:
+            evaluate_candidate(resume_for_evaluation(candidate), job_desc, usage)
+        except Exception:
+            failed += 1
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "failed": failed,
+        **usage.snapshot(),
+    }
+
+
+def _benchmark_batched(
+    candidates: List[Dict], job_desc: str, batch_size: int
+) -> Dict[str, Any]:
+    usage = LLMUsage()
+    started = time.perf_counter()
+    failed = fallbacks = 0
+    for i in range(0, len(candidates), batch_size):
+        resumes = {
+            c["candidate_id"]: resume_for_evaluation(c)
+            for c in candidates[i : i + batch_size]
+        }
+        try:
+            evaluations = evaluate_candidate_batch(resumes, job_desc, usage)
+        except Exception:
+            evaluations = {}
+        for cid, resume in resumes.items():
+            if cid in evaluations:
+                continue
+            fallbacks += 1
+            try:
+                evaluate_candidate(resume, job_desc, usage)
+            except Exception:
+                failed += 1
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "failed": failed,
+        "fallbacks": fallbacks,
+        **usage.snapshot(),
+    }
+
+
+def _savings(baseline: Dict[str, Any], contender: Dict[str, Any], key: str):
+    if not baseline[key]:
+        return None
+    return round(100 * (1 - contender[key] / baseline[key]), 1)
+
+
+@router.post(
+    "/screening/benchmark",
+    response_model=dict,
+    summary="Compare latency and token use of single and batched evaluation",
+)
+def screening_benchmark(
+    job_id: str = Query(..., examples=["769a7894"]),
+    limit: int = Query(10, ge=1, le=50),
+    batch_size: int = Query(5, ge=2, le=20),
+):
+    """
+    Evaluate the job's applied candidates once per candidate and once in
+    batches, sequentially and bypassing the evaluation cache, and report the
+    wall time, Gemini calls and tokens of each.
+    """
+    job_desc, job_vec = load_job(job_id)
+    candidates = hybrid_search_applied_candidates(job_desc, job_vec, limit, job_id)
+    if not candidates:
+        raise HTTPException(status_code=404, detail="No applied candidates found")
+    baseline = _benchmark_single(candidates, job_desc)
+    contender = _benchmark_batched(candidates, job_desc, batch_size)
+    return {
+        "candidates": len(candidates),
+        "batch_size": batch_size,
+        "single": baseline,
+        "batched": contender,
+        "savings_percent": {
+            "seconds": _savings(baseline, contender, "seconds"),
+            "calls": _savings(baseline, contender, "calls"),
+            "prompt_tokens": _savings(baseline, contender, "prompt_tokens"),
+            "total_tokens": _savings(baseline, contender, "total_tokens"),
+        },
+    }
+
+
+@router.delete("/screening/cache", response_model=dict)
+def invalidate_screening_cache(job_id: str = Query(..., examples=["769a7894"])):
+    """Drop cached evaluations of a job so the next run re-evaluates everyone"""
+    return {"job_id": job_id, "invalidated": invalidate_job(job_id)}
+
+
+@router.get("/screening/cache/stats", response_model=dict)
+def screening_cache_stats():
+    return evaluation_cache.stats()
+
+
 @router.get("/screening/summary")
 def screening_summary(job_id: str = Query(..., examples=["769a7894"])):
     if not job_id:
@@ -437,11 +1182,17 @@ def screening_summary(job_id: str = Query(..., examples=["769a7894"])):
             limit=1000,
             return_properties=["candidate_id"],
         )
+        # Counts of the latest /screening/run for this job; zeros until one ran
+        last_run = screening_runs.get(f"funnel:{job_id}")
+        funnel = json.loads(last_run) if last_run else {}
         summary = {
-            "fast_filter_processed": len(resp.objects),
-            "fast_filter_filtered": 0,  # Placeholder, as no fast filter is implemented
-            "semantic_matched": len(resp.objects),
-            "llm_evaluated": len(resp.objects),
+            "total_candidates": len(resp.objects),
+            "fast_filter_processed": funnel.get("fast_filter_processed", 0),
+            "fast_filter_filtered": funnel.get("fast_filter_filtered", 0),
+            "semantic_matched": funnel.get("semantic_matched", 0),
+            "llm_submitted": funnel.get("llm_submitted", 0),
+            "llm_evaluated": funnel.get("llm_evaluated", 0),
+            "last_run_at": funnel.get("run_at"),
         }
         logger.info(f"Summary for job_id {job_id}: {summary}")
         return summary
@@ -0,0 +1,98 @@
+"""
+Per-file processing checkpoints on SQLite: the output of the last finished
+pipeline stage of every PDF, so an interrupted run resumes where it stopped
+"""
+import os
+import json
+import sqlite3
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "./data/checkpoints.sqlite3")
+
+
+class CheckpointStore:
+    def __init__(self, db_path: str = CHECKPOINT_DB_PATH):
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    job_id TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (job_id, filename)
+                )
+                """
+            )
+
+    @contextmanager
+    def _conn(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def save(
+        self,
+        job_id: str,
+        filename: str,
+        sha256: str,
+        version: str,
+        stage: str,
+        value: Any,
+    ) -> None:
+        """Record the output of the latest finished stage of one file"""
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints "
+                "(job_id, filename, sha256, version, stage, value, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    filename,
+                    sha256,
+                    version,
+                    stage,
+                    json.dumps(value, default=str),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def load(
+        self, job_id: str, filename: str, sha256: str, version: str
+    ) -> Optional[Tuple[str, Any]]:
+        """
+        Returns:
+            (stage, value) of the file's checkpoint, or None when there is none
+            or it was taken for other file content or another pipeline version
+        """
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT sha256, version, stage, value FROM checkpoints "
+                "WHERE job_id = ? AND filename = ?",
+                (job_id, filename),
+            ).fetchone()
+        if row is None or row[0] != sha256 or row[1] != version:
+            return None
+        return row[2], json.loads(row[3])
+
+    def clear(self, job_id: str, filename: str) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "DELETE FROM checkpoints WHERE job_id = ? AND filename = ?",
+                (job_id, filename),
+            )
@@ -0,0 +1,257 @@
+"""
+Local compaction of parsed resume text before LLM extraction: splits it into
+sections, drops layout noise and repeated page headers/footers, and trims
+low-priority sections to fit a token budget
+"""
+import os
+import re
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.pdf_text import header_title
+
+RESUME_COMPACTION = os.getenv("RESUME_COMPACTION", "1").lower() in {"1", "true", "yes"}
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "3000"))
+# Bump when compaction output changes, so checkpointed compacted text is redone
+COMPACTION_VERSION = 3
+
+PREAMBLE = "preamble"
+# Trim priority of explicit headings that match no known section
+UNKNOWN_SECTION_PRIORITY = 2
+
+# Lower number = kept longer when over budget
+_SECTION_PRIORITIES = [
+    (
+        0,
+        (
+            "experience",
+            "employment",
+            "work history",
+            "internship",
+            "skill",
+            "competenc",
+        ),
+    ),
+    (
+        1,
+        (
+            "summary",
+            "profile",
+            "objective",
+            "about",
+            "education",
+            "academic",
+            "qualification",
+            "project",
+            "certific",
+            "licen",
+        ),
+    ),
+    (
+        2,
+        (
+            "award",
+            "honor",
+            "achievement",
+            "publication",
+            "language",
+            "volunteer",
+            "leadership",
+            "activit",
+            "contact",
+        ),
+    ),
+    (3, ("reference", "interest", "hobb")),
+]
+
+_NOISE_PATTERNS = [
+    re.compile(r"^page\s+\d+(\s+of\s+\d+)?$", re.I),
+    re.compile(r"^\d{1,3}(\s*/\s*\d{1,3})?$"),  # bare page numbers
+    re.compile(r"^[\s\-_=*~•·|:+#]+$"),  # rules, table separators, empty rows
+    re.compile(r"^!\[[^\]]*\]\([^)]*\)$"),  # image placeholders
+    re.compile(r"^<!--.*-->$"),
+    re.compile(r"^(curriculum vitae|resume|résumé|cv)$", re.I),
+]
+
+
+# Contact details: the usual content of running page headers/footers
+_CONTACT_RE = re.compile(
+    r"@|https?://|www\.|linkedin|github|\+?\d[\d\s().-]{7,}\d", re.I
+)
+# Repeats are legitimate here (same role, city or bullet under two employers)
+_PROTECTED_SECTIONS = (
+    "experience",
+    "employment",
+    "work history",
+    "internship",
+    "education",
+    "academic",
+    "qualification",
+    "project",
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (~4 characters per token for English text)"""
+    return math.ceil(len(text) / 4)
+
+
+def section_priority(title: str) -> Optional[int]:
+    """Trim priority of a section title, None if it is not a known section"""
+    if title == PREAMBLE:
+        return 0  # name and contact details
+    lowered = title.lower()
+    for priority, keywords in _SECTION_PRIORITIES:
+        if any(k in lowered for k in keywords):
+            return priority
+    return None
+
+
+def _is_protected(title: str) -> bool:
+    lowered = title.lower()
+    return any(k in lowered for k in _PROTECTED_SECTIONS)
+
+
+def _trim_priority(title: str) -> int:
+    priority = section_priority(title)
+    return UNKNOWN_SECTION_PRIORITY if priority is None else priority
+
+
+def _line_key(line: str) -> str:
+    return re.sub(r"[^\w@.+]+", " ", line.lower()).strip()
+
+
+def _clean_line(raw: str) -> str:
+    return re.sub(r"\s+", " ", raw).strip()
+
+
+_MARKDOWN_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*#*$")
+
+
+def _heading(line: str) -> Tuple[str, bool]:
+    """
+    (section title, explicit) if the line is a section header. Markdown
+    headings always are; plain lines only when they look like a known section.
+    """
+    match = _MARKDOWN_HEADING_RE.match(line)
+    if match:
+        title = match.group(1).strip("*_").strip().rstrip(":").strip()
+        return title, True
+    title = header_title(line.strip("*_").strip())
+    # Other short caps lines (the candidate's name, employers) stay content
+    if title and section_priority(title) is None:
+        return "", False
+    return title, False
+
+
+def segment(text: str) -> List[Tuple[str, List[str]]]:
+    """
+    Split text into (section title, lines), merging sections whose header is
+    repeated (e.g. once per page). Text before the first header is the preamble.
+    Every markdown heading opens a section, known or not.
+    """
+    sections: Dict[str, List[str]] = {PREAMBLE: []}
+    titles = {PREAMBLE: PREAMBLE}
+    current = PREAMBLE
+    for raw in text.splitlines():
+        line = _clean_line(raw)
+        if not line:
+            continue
+        title, explicit = _heading(line)
+        if (
+            explicit
+            and current == PREAMBLE
+            and not sections[PREAMBLE]
+            and section_priority(title) is None
+        ):
+            # An unknown heading opening the text is the candidate's name
+            sections[PREAMBLE].append(title)
+            continue
+        if title:
+            current = title.lower()
+            titles.setdefault(current, title.title() if title.isupper() else title)
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(line)
+    return [(titles[key], lines) for key, lines in sections.items() if lines]
+
+
+def compact(
+    text: str, token_budget: int = RESUME_TOKEN_BUDGET
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Compact a parsed resume for the extraction prompt.
+
+    Returns:
+        (compacted markdown, report with tokens_before / tokens_after and what
+        was removed)
+    """
+    tokens_before = estimate_tokens(text)
+    segments = segment(text)
+    # Lines of the first page's header block; seeing them again later means a
+    # running page header/footer
+    preamble = {
+        _line_key(line)
+        for title, lines in segments
+        if title == PREAMBLE
+        for line in lines
+    }
+    seen = set()
+    noise_lines = duplicate_lines = 0
+    sections: List[Tuple[str, List[str]]] = []
+    for title, lines in segments:
+        protected = _is_protected(title)
+        kept = []
+        for line in lines:
+            if any(p.match(line) for p in _NOISE_PATTERNS):
+                noise_lines += 1
+                continue
+            key = _line_key(line)
+            # Only header/footer shaped repeats go; other repeats are content
+            if (
+                key in seen
+                and not protected
+                and (key in preamble or _CONTACT_RE.search(line))
+            ):
+                duplicate_lines += 1
+                continue
+            seen.add(key)
+            kept.append(line)
+        if kept:
+            sections.append((title, kept))
+
+    def render(parts: List[Tuple[str, List[str]]]) -> str:
+        blocks = []
+        for title, lines in parts:
+            body = "\n".join(lines)
+            blocks.append(body if title == PREAMBLE else f"## {title}\n{body}")
+        return "\n\n".join(blocks)
+
+    # Trim from the end of the lowest-priority, last-positioned sections first
+    truncated: Dict[str, int] = {}
+    order = sorted(
+        range(len(sections)), key=lambda i: (-_trim_priority(sections[i][0]), -i)
+    )
+    total = estimate_tokens(render(sections))
+    for i in order:
+        if total <= token_budget:
+            break
+        title, lines = sections[i]
+        while lines and total > token_budget:
+            total -= estimate_tokens(lines.pop()) or 1
+            truncated[title] = truncated.get(title, 0) + 1
+        total = estimate_tokens(render([s for s in sections if s[1]]))
+
+    sections = [s for s in sections if s[1]]
+    compacted = render(sections)
+    kept_titles = {title for title, _ in sections}
+    return compacted, {
+        "tokens_before": tokens_before,
+        "tokens_after": estimate_tokens(compacted),
+        "token_budget": token_budget,
+        "sections": [title for title, _ in sections],
+        "dropped_sections": sorted(t for t in truncated if t not in kept_titles),
+        "truncated_lines": truncated,
+        "noise_lines": noise_lines,
+        "duplicate_lines": duplicate_lines,
+    }
@@ -0,0 +1,152 @@
+"""
+Prompt prefixes shared by many LLM calls, registered once as provider-side
+cached context so each call only sends (and is billed for) its own suffix.
+GeminiContext uses Gemini explicit context caching; LocalContext is an
+in-process stand-in with the same interface that forwards full prompts to a
+given generate function and records what a cached call would have sent.
+"""
+import os
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from google import genai
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_CACHE_ENABLED = os.getenv("CONTEXT_CACHE", "0").lower() in {"1", "true", "yes"}
+# Safety net only: contexts are deleted when their run ends
+CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("CONTEXT_CACHE_TTL_SECONDS", "1800"))
+
+
+class CachedContext:
+    def __init__(self, prefix: str):
+        """
+        A shared prompt prefix whose lifetime is one unit of work (e.g. one
+        screening run); use as a context manager so it is always released.
+        """
+        self.prefix = prefix
+        self.calls = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def cached(self) -> bool:
+        """Whether calls send only their suffix"""
+        return False
+
+    def generate(self, suffix: str, config: Dict[str, Any]):
+        """Run one call as prefix + suffix; returns the provider response"""
+        if self.closed:
+            raise RuntimeError("context already released")
+        with self._lock:
+            self.calls += 1
+        return self._generate(suffix, config)
+
+    def _generate(self, suffix: str, config: Dict[str, Any]):
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.closed = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached": self.cached,
+            "calls": self.calls,
+            "prefix_chars": len(self.prefix),
+        }
+
+    def __enter__(self) -> "CachedContext":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GeminiContext(CachedContext):
+    def __init__(
+        self,
+        model: str,
+        prefix: str,
+        timeout_seconds: float,
+        ttl_seconds: int = CONTEXT_CACHE_TTL_SECONDS,
+        display_name: Optional[str] = None,
+        enabled: bool = CONTEXT_CACHE_ENABLED,
+    ):
+        """
+        Registers the prefix with Gemini. When that is disabled or fails (e.g.
+        the prefix is below the model's minimum cacheable size), calls send
+        the full prompt instead.
+        """
+        super().__init__(prefix)
+        self.model = model
+        self.name: Optional[str] = None
+        self._client = genai.Client(
+            api_key=os.getenv("GEMINI_API_KEY"),
+            http_options={"timeout": int(timeout_seconds * 1000)},
+        )
+        if not enabled:
+            return
+        try:
+            cache = self._client.caches.create(
+                model=model,
+                config={
+                    "contents": [prefix],
+                    "ttl": f"{ttl_seconds}s",
+                    "display_name": display_name,
+                },
+            )
+            self.name = cache.name
+            logger.info(f"Created context cache {self.name} ({display_name})")
+        except Exception as e:
+            logger.warning(f"Context cache unavailable, sending full prompts: {e}")
+
+    @property
+    def cached(self) -> bool:
+        return self.name is not None
+
+    def _generate(self, suffix: str, config: Dict[str, Any]):
+        if self.name is None:
+            return self._client.models.generate_content(
+                model=self.model, contents=self.prefix + suffix, config=config
+            )
+        return self._client.models.generate_content(
+            model=self.model,
+            contents=suffix,
+            config={**config, "cached_content": self.name},
+        )
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        super().close()
+        if self.name is None:
+            return
+        try:
+            self._client.caches.delete(name=self.name)
+            logger.info(f"Deleted context cache {self.name}")
+        except Exception as e:
+            # The TTL still expires it
+            logger.warning(f"Failed to delete context cache {self.name}: {e}")
+
+
+class LocalContext(CachedContext):
+    def __init__(
+        self, prefix: str, generate: Callable[[str, Dict[str, Any]], Any]
+    ):
+        """
+        Stand-in for GeminiContext: generate(prompt, config) gets the full
+        prompt, while `sent` keeps the suffixes a cached call would send.
+        """
+        super().__init__(prefix)
+        self._generate_fn = generate
+        self.sent: List[str] = []
+
+    @property
+    def cached(self) -> bool:
+        return True
+
+    def _generate(self, suffix: str, config: Dict[str, Any]):
+        with self._lock:
+            self.sent.append(suffix)
+        return self._generate_fn(self.prefix + suffix, config)
@@ -0,0 +1,340 @@
+"""
+Near-duplicate resume detection: MinHash fingerprints over word shingles with an
+LSH band index on SQLite, storing the processed profile (and vector) of every
+fingerprinted document so near-duplicates can reuse it. Profiles are tagged with
+the pipeline version and embedding model that produced them and only reused
+under the same ones. The index is capped at a number of documents, least
+recently matched ones evicted first.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEDUP_DB_PATH = os.getenv("DEDUP_DB_PATH", "./data/cache/fingerprints.sqlite3")
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.9"))
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "50000"))
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        """
+        Args:
+            num_perm: Signature length; similarity resolution is 1 / num_perm
+            shingle_size: Words per shingle
+            seed: Fixed so signatures stay comparable across restarts
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # a, b < 2**32 and hashes < 2**32 keep a * h + b inside uint64
+        self._a = rng.randint(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Iterable[str]:
+        words = re.findall(r"\w+", (text or "").lower())
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)}
+        return {
+            " ".join(words[i : i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    @staticmethod
+    def _hash32(shingle: str) -> int:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest()
+        return int.from_bytes(digest, "little")
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.array(
+            [self._hash32(s) for s in self.shingles(text)], dtype=np.uint64
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the two shingle sets"""
+        return float(np.mean(a == b))
+
+
+class NearDuplicateIndex:
+    def __init__(
+        self,
+        db_path: str = DEDUP_DB_PATH,
+        threshold: float = DEDUP_THRESHOLD,
+        num_perm: int = 128,
+        bands: int = 32,
+        max_entries: int = DEDUP_MAX_ENTRIES,
+    ):
+        """
+        Args:
+            db_path: SQLite file holding fingerprints, LSH buckets and profiles
+            threshold: Minimum estimated Jaccard similarity to count as a duplicate
+            num_perm: MinHash signature length (must be divisible by bands)
+            bands: LSH bands; more bands find lower-similarity candidates
+            max_entries: Least recently matched documents are evicted above this
+        """
+        self.db_path = db_path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    doc_hash TEXT PRIMARY KEY,
+                    signature BLOB NOT NULL,
+                    profile TEXT NOT NULL,
+                    job_id TEXT,
+                    filename TEXT,
+                    version TEXT,
+                    embedding_model TEXT,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS bands (
+                    band INTEGER NOT NULL,
+                    bucket TEXT NOT NULL,
+                    doc_hash TEXT NOT NULL,
+                    PRIMARY KEY (band, bucket, doc_hash)
+                );
+                """
+            )
+            # Indexes created before profiles were versioned; their untagged
+            # rows never match a query again
+            columns = {r[1] for r in conn.execute("PRAGMA table_info(documents)")}
+            for column in ("version", "embedding_model"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE documents ADD COLUMN {column} TEXT")
+            if "accessed_at" not in columns:
+                conn.execute("ALTER TABLE documents ADD COLUMN accessed_at REAL")
+                conn.execute("UPDATE documents SET accessed_at = created_at")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS documents_accessed "
+                "ON documents (accessed_at)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS bands_doc ON bands (doc_hash)")
+
+    @contextmanager
+    def _conn(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _buckets(self, signature: np.ndarray) -> List[Tuple[int, str]]:
+        return [
+            (
+                band,
+                hashlib.sha1(
+                    signature[band * self.rows : (band + 1) * self.rows].tobytes()
+                ).hexdigest(),
+            )
+            for band in range(self.bands)
+        ]
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.hasher.signature(text)
+
+    def query(
+        self,
+        signature: np.ndarray,
+        version: str,
+        embedding_model: str,
+        exclude: Optional[Tuple[str, str]] = None,
+    ) -> Optional[Tuple[str, float, Dict[str, Any]]]:
+        """
+        Best stored near-duplicate of a signature.
+
+        Args:
+            version: Pipeline version (prompts, schema, ...) the profile must have
+            embedding_model: Model the stored vector must come from
+            exclude: (job_id, filename) whose own earlier fingerprint is skipped
+        Returns:
+            (doc_hash, similarity, record) or None; record holds the stored
+            profile plus the job_id / filename it came from
+        """
+        buckets = self._buckets(signature)
+        with self._conn() as conn:
+            candidates = set()
+            for band, bucket in buckets:
+                for (doc_hash,) in conn.execute(
+                    "SELECT doc_hash FROM bands WHERE band = ? AND bucket = ?",
+                    (band, bucket),
+                ):
+                    candidates.add(doc_hash)
+            best = None
+            for doc_hash in candidates:
+                row = conn.execute(
+                    "SELECT signature, profile, job_id, filename FROM documents "
+                    "WHERE doc_hash = ? AND version = ? AND embedding_model = ?",
+                    (doc_hash, version, embedding_model),
+                ).fetchone()
+                if row is None or (exclude and (row[2], row[3]) == tuple(exclude)):
+                    continue
+                stored = np.frombuffer(row[0], dtype=np.uint64)
+                sim = MinHasher.similarity(signature, stored)
+                if sim >= self.threshold and (best is None or sim > best[1]):
+                    record = {
+                        "profile": json.loads(row[1]),
+                        "job_id": row[2],
+                        "filename": row[3],
+                    }
+                    best = (doc_hash, sim, record)
+            if best is not None:
+                conn.execute(
+                    "UPDATE documents SET accessed_at = ? WHERE doc_hash = ?",
+                    (time.time(), best[0]),
+                )
+        return best
+
+    def add(
+        self,
+        doc_hash: str,
+        signature: np.ndarray,
+        profile: Dict[str, Any],
+        version: str,
+        embedding_model: str,
+        job_id: Optional[str] = None,
+        filename: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents "
+                "(doc_hash, signature, profile, job_id, filename, version, "
+                "embedding_model, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    doc_hash,
+                    signature.astype(np.uint64).tobytes(),
+                    json.dumps(profile, default=str),
+                    job_id,
+                    filename,
+                    version,
+                    embedding_model,
+                    now,
+                    now,
+                ),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO bands (band, bucket, doc_hash) VALUES (?, ?, ?)",
+                [(band, bucket, doc_hash) for band, bucket in self._buckets(signature)],
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        excess = total - self.max_entries
+        if excess <= 0:
+            return
+        doc_hashes = [
+            (doc_hash,)
+            for (doc_hash,) in conn.execute(
+                "SELECT doc_hash FROM documents ORDER BY accessed_at LIMIT ?",
+                (excess,),
+            )
+        ]
+        conn.executemany("DELETE FROM bands WHERE doc_hash = ?", doc_hashes)
+        conn.executemany("DELETE FROM documents WHERE doc_hash = ?", doc_hashes)
+        with self._lock:
+            self.evictions += len(doc_hashes)
+        logger.info(f"dedup: evicted {len(doc_hashes)} least recently used documents")
+
+
+class DedupSession:
+    def __init__(
+        self, index: NearDuplicateIndex, size: int, version: str, embedding_model: str
+    ):
+        """
+        Per-run view of the index. Items of the same run that are near-duplicates
+        of each other are serialized: the later one waits for the earlier one to
+        finish and is then matched against its stored profile.
+
+        Args:
+            index: Persistent near-duplicate index
+            size: Number of items in the run (indexes 0..size-1)
+            version: Pipeline version stored with, and required of, profiles
+            embedding_model: Embedding model stored with, and required of, vectors
+        """
+        self.index = index
+        self.version = version
+        self.embedding_model = embedding_model
+        self._state: Dict[int, Tuple[str, np.ndarray]] = {}
+        self._finished = [threading.Event() for _ in range(size)]
+        self._lock = threading.Lock()
+
+    def check(
+        self, idx: int, text: str, source: Optional[Tuple[str, str]] = None
+    ) -> Optional[Tuple[str, float, Dict[str, Any]]]:
+        """
+        Fingerprint item idx and return its best stored near-duplicate, if any.
+        source is the item's (job_id, filename); its own earlier fingerprint is
+        never returned, so re-processing a file always re-runs the pipeline.
+        """
+        doc_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        signature = self.index.signature(text)
+        with self._lock:
+            twin = next(
+                (
+                    j
+                    for j, (_, other) in self._state.items()
+                    if MinHasher.similarity(signature, other) >= self.index.threshold
+                ),
+                None,
+            )
+            self._state[idx] = (doc_hash, signature)
+        if twin is not None:
+            self._finished[twin].wait()
+        match = self.index.query(
+            signature, self.version, self.embedding_model, exclude=source
+        )
+        if match is not None:
+            self.release(idx)
+        return match
+
+    def record(
+        self, idx: int, profile: Dict[str, Any], job_id: str, filename: str
+    ) -> None:
+        """Store the processed profile of item idx and release items waiting on it"""
+        try:
+            # Items resumed past the dedup stage were never fingerprinted
+            if idx in self._state:
+                doc_hash, signature = self._state[idx]
+                self.index.add(
+                    doc_hash,
+                    signature,
+                    profile,
+                    self.version,
+                    self.embedding_model,
+                    job_id,
+                    filename,
+                )
+        finally:
+            self.release(idx)
+
+    def release(self, idx: int) -> None:
+        self._finished[idx].set()
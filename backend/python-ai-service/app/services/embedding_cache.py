@@ -0,0 +1,235 @@
+"""
+Content-addressed embedding cache: a bounded in-memory LRU tier in front of a
+persistent on-disk tier (memory-mapped float32 matrix plus a key index). The
+disk tier may be shared by several worker processes: appends hold an
+inter-process file lock and every key records the row its vector landed in.
+"""
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "./data/embedding_cache")
+EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "4096"))
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Canonical form used both for the cache key and for the encode itself"""
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Exclusive lock shared with other processes using the same cache dir"""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Optional[str] = EMBEDDING_CACHE_DIR,
+        max_memory_items: int = EMBEDDING_CACHE_MEMORY_ITEMS,
+    ):
+        """
+        Args:
+            model_name: Part of every key, so vectors from different models never mix
+            cache_dir: Root of the disk tier; empty/None keeps the cache in memory only
+            max_memory_items: Size of the in-memory LRU tier
+        """
+        self.model_name = model_name
+        self.max_memory_items = max(0, max_memory_items)
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._index: Dict[str, int] = {}
+        self._keys_offset = 0  # bytes of keys.txt already read into _index
+        self._dim: Optional[int] = None
+        self._matrix: Optional[np.memmap] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.dir: Optional[Path] = None
+        if cache_dir:
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+            self.dir = Path(cache_dir) / slug
+            self.dir.mkdir(parents=True, exist_ok=True)
+            self._load_index()
+
+    # ----- disk tier -----
+    @property
+    def _meta_path(self) -> Path:
+        return self.dir / "meta.json"
+
+    @property
+    def _keys_path(self) -> Path:
+        return self.dir / "keys.txt"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.dir / "vectors.f32"
+
+    @property
+    def _lock_path(self) -> Path:
+        return self.dir / "lock"
+
+    def _load_index(self) -> None:
+        try:
+            with _file_lock(self._lock_path):
+                if not self._meta_path.exists():
+                    return
+                self._dim = int(json.loads(self._meta_path.read_text())["dim"])
+                self._refresh_index()
+            logger.info(f"Loaded {len(self._index)} cached embeddings from {self.dir}")
+        except Exception as e:
+            logger.error(f"Failed to load embedding cache {self.dir}, starting empty: {e}")
+            self._index = {}
+            self._keys_offset = 0
+            self._dim = None
+
+    def _refresh_index(self) -> None:
+        """
+        Read the "key row" lines appended since the last refresh, including
+        those written by other processes. Vectors are written before their
+        key, so a key always points at a complete row.
+        """
+        if self._dim is None or not self._keys_path.exists():
+            return
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            data = f.read()
+        # A line another process is still writing is picked up next time
+        complete = data[: data.rfind(b"\n") + 1]
+        self._keys_offset += len(complete)
+        for line in complete.decode("utf-8").splitlines():
+            parts = line.split()
+            if len(parts) == 2 and parts[1].isdigit():
+                self._index[parts[0]] = int(parts[1])
+
+    def _read_row(self, row: int) -> List[float]:
+        if self._matrix is None or row >= self._matrix.shape[0]:
+            rows = self._vectors_path.stat().st_size // (self._dim * 4)
+            self._matrix = np.memmap(
+                self._vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(rows, self._dim),
+            )
+        return self._matrix[row].tolist()
+
+    def _append_row(self, key: str, vector: List[float]) -> None:
+        with _file_lock(self._lock_path):
+            if self._dim is None:
+                if self._meta_path.exists():
+                    self._dim = int(json.loads(self._meta_path.read_text())["dim"])
+                else:
+                    self._dim = len(vector)
+                    self._meta_path.write_text(
+                        json.dumps({"model": self.model_name, "dim": self._dim})
+                    )
+            self._refresh_index()
+            if key in self._index:
+                return  # appended by another worker meanwhile
+            if len(vector) != self._dim:
+                logger.warning(
+                    f"Not caching vector of dim {len(vector)} (cache dim {self._dim})"
+                )
+                return
+            row_bytes = self._dim * 4
+            with open(self._vectors_path, "ab") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size % row_bytes:
+                    # Half-written row left by a crashed writer
+                    f.truncate(size - size % row_bytes)
+                    size -= size % row_bytes
+                row = size // row_bytes
+                f.write(np.asarray(vector, dtype=np.float32).tobytes())
+            with open(self._keys_path, "a") as f:
+                f.write(f"{key} {row}\n")
+        self._index[key] = row
+
+    # ----- public API -----
+    def key(self, normalized_text: str) -> str:
+        payload = f"{self.model_name}\n{normalized_text}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+            row = self._index.get(key)
+            if row is None and self.dir is not None:
+                # Another worker may have cached it since
+                self._refresh_index()
+                row = self._index.get(key)
+            if row is not None:
+                vector = self._read_row(row)
+                self._remember(key, vector)
+                self.disk_hits += 1
+                return vector
+            self.misses += 1
+            return None
+
+    def put(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._remember(key, vector)
+            if self.dir is not None and key not in self._index:
+                try:
+                    self._append_row(key, vector)
+                except OSError as e:
+                    logger.error(f"Failed to persist embedding to {self.dir}: {e}")
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        if not self.max_memory_items:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "dir": str(self.dir) if self.dir else None,
+                "memory_items": len(self._memory),
+                "max_memory_items": self.max_memory_items,
+                "disk_items": len(self._index),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,74 @@
+"""
+Parity check and throughput benchmark for embedding backends
+"""
+import time
+import logging
+from typing import List, Dict, Any
+
+import numpy as np
+
+from app.services.embeddings import EmbeddingRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def cosine_drift(
+    reference: List[List[float]], candidate: List[List[float]]
+) -> Dict[str, Any]:
+    """
+    Compare vectors from a new backend against stored fp32 reference vectors
+
+    Returns:
+        Dict with cosine similarity distribution and drift (1 - cosine)
+    """
+    if not reference:
+        return {"count": 0}
+    ref = np.asarray(reference, dtype=np.float32)
+    cand = np.asarray(candidate, dtype=np.float32)
+    ref /= np.linalg.norm(ref, axis=1, keepdims=True) + 1e-12
+    cand /= np.linalg.norm(cand, axis=1, keepdims=True) + 1e-12
+    cosine = np.sum(ref * cand, axis=1)
+    drift = 1.0 - cosine
+    return {
+        "count": int(len(cosine)),
+        "cosine_mean": round(float(cosine.mean()), 6),
+        "cosine_min": round(float(cosine.min()), 6),
+        "cosine_p5": round(float(np.percentile(cosine, 5)), 6),
+        "drift_mean": round(float(drift.mean()), 6),
+        "drift_max": round(float(drift.max()), 6),
+    }
+
+
+def parity_check(
+    registry: EmbeddingRegistry, texts: List[str], stored_vectors: List[List[float]]
+) -> Dict[str, Any]:
+    """Re-embed texts with the registry's backend and compare with stored vectors"""
+    vectors = registry.encode(texts) if texts else []
+    report = cosine_drift(stored_vectors, vectors)
+    report["backend"] = registry.backend
+    logger.info(f"Embedding parity for {registry.model_id}: {report}")
+    return report
+
+
+def benchmark(
+    registry: EmbeddingRegistry, texts: List[str], batch_size: int = 32, rounds: int = 3
+) -> Dict[str, Any]:
+    """Measure encode throughput of one backend on the given texts"""
+    registry.warmup()
+    timings = []
+    for _ in range(max(1, rounds)):
+        started = time.perf_counter()
+        for i in range(0, len(texts), batch_size):
+            registry.encode(texts[i : i + batch_size])
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    return {
+        "backend": registry.backend,
+        "texts": len(texts),
+        "batch_size": batch_size,
+        "rounds": len(timings),
+        "best_seconds": round(best, 4),
+        "texts_per_second": round(len(texts) / best, 2) if best > 0 else None,
+        "load_seconds": registry.load_seconds,
+        "model_rss_mb": registry.stats()["model_rss_mb"],
+    }
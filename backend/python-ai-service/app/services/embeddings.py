@@ -0,0 +1,315 @@
+"""
+Process-wide embedding model registry shared by all routers, a
+micro-batching queue that coalesces concurrent embed() calls, and the
+content-addressed cache in front of both
+"""
+import os
+import time
+import queue
+import threading
+import logging
+from concurrent.futures import Future
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from app.services.metrics import Histogram
+from app.services.embedding_cache import EmbeddingCache, normalize_text
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-mpnet-base-v2")
+# torch = fp32 PyTorch, onnx = fp32 ONNX Runtime, onnx-int8 = dynamically quantized ONNX
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+EMBEDDING_ONNX_INT8_FILE = os.getenv(
+    "EMBEDDING_ONNX_INT8_FILE", "onnx/model_qint8_avx512_vnni.onnx"
+)
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "./data/onnx_models")
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+
+
+def _rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError):
+        # Not on Linux: fall back to peak RSS (KB on Linux, bytes on macOS)
+        try:
+            import resource
+        except ImportError:  # Windows
+            return None
+        try:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            divisor = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+            return round(peak / divisor, 1)
+        except Exception:
+            return None
+
+
+class EmbeddingRegistry:
+    def __init__(
+        self, model_name: str = EMBEDDING_MODEL, backend: str = EMBEDDING_BACKEND
+    ):
+        """Hold a single lazily-loaded SentenceTransformer for the whole worker"""
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(
+                f"Unknown embedding backend {backend!r}, expected one of {EMBEDDING_BACKENDS}"
+            )
+        self.model_name = model_name
+        self.backend = backend
+        self._model = None
+        self._lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+        self.rss_before_load_mb: Optional[float] = None
+        self.rss_after_load_mb: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def model_id(self) -> str:
+        """Model name qualified by backend; vectors differ slightly between backends"""
+        if self.backend == "torch":
+            return self.model_name
+        return f"{self.model_name}@{self.backend}"
+
+    def get_model(self):
+        """Return the shared model, loading it on first use"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+
+    def _load(self):
+        # Imported here so importing the routers does not pull in torch
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"Loading embedding model {self.model_id}")
+        self.rss_before_load_mb = _rss_mb()
+        started = time.perf_counter()
+        if self.backend == "torch":
+            model = SentenceTransformer(self.model_name)
+        elif self.backend == "onnx":
+            model = SentenceTransformer(self.model_name, backend="onnx")
+        else:
+            model = self._load_onnx_int8()
+        self.load_seconds = round(time.perf_counter() - started, 3)
+        self.rss_after_load_mb = _rss_mb()
+        logger.info(
+            f"Loaded embedding model {self.model_id} in {self.load_seconds}s "
+            f"(RSS {self.rss_before_load_mb} MB -> {self.rss_after_load_mb} MB)"
+        )
+        return model
+
+    def _load_onnx_int8(self):
+        """Load a published int8 ONNX export, or quantize one locally on first use"""
+        from sentence_transformers import (
+            SentenceTransformer,
+            export_dynamic_quantized_onnx_model,
+        )
+
+        try:
+            return SentenceTransformer(
+                self.model_name,
+                backend="onnx",
+                model_kwargs={"file_name": EMBEDDING_ONNX_INT8_FILE},
+            )
+        except Exception as e:
+            logger.warning(
+                f"No published {EMBEDDING_ONNX_INT8_FILE} for {self.model_name} ({e}), "
+                "quantizing locally"
+            )
+
+        local_dir = Path(EMBEDDING_ONNX_DIR) / self.model_name.replace("/", "_")
+        quantized = sorted(local_dir.glob("onnx/model_*int8*.onnx"))
+        if not quantized:
+            fp32 = SentenceTransformer(self.model_name, backend="onnx")
+            fp32.save(str(local_dir))
+            export_dynamic_quantized_onnx_model(
+                fp32, quantization_config="avx2", model_name_or_path=str(local_dir)
+            )
+            quantized = sorted(local_dir.glob("onnx/model_*int8*.onnx"))
+        return SentenceTransformer(
+            str(local_dir),
+            backend="onnx",
+            model_kwargs={"file_name": str(quantized[0].relative_to(local_dir))},
+        )
+
+    def warmup(self) -> Dict[str, Any]:
+        """Load the model eagerly and run one encode so the first request is not slow"""
+        self.encode([""])
+        return self.stats()
+
+    def dimension(self) -> int:
+        return self.get_model().get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        """Encode a batch of texts into normalized embeddings"""
+        model = self.get_model()
+        vectors = model.encode(
+            [t or "" for t in texts], normalize_embeddings=True
+        )
+        return vectors.tolist()
+
+    def embed(self, text: str) -> List[float]:
+        """Encode a single text into a normalized embedding"""
+        return self.encode([text])[0]
+
+    def stats(self) -> Dict[str, Any]:
+        model_mb = None
+        if self.rss_before_load_mb is not None and self.rss_after_load_mb is not None:
+            model_mb = round(self.rss_after_load_mb - self.rss_before_load_mb, 1)
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "loaded": self.loaded,
+            "load_seconds": self.load_seconds,
+            "rss_before_load_mb": self.rss_before_load_mb,
+            "rss_after_load_mb": self.rss_after_load_mb,
+            "model_rss_mb": model_mb,
+            "rss_mb": _rss_mb(),
+        }
+
+
+class EmbeddingBatcher:
+    def __init__(
+        self,
+        registry: EmbeddingRegistry,
+        max_batch: int = EMBEDDING_MAX_BATCH,
+        max_wait_ms: float = EMBEDDING_MAX_WAIT_MS,
+    ):
+        """
+        Collect embed requests from concurrent callers and encode them together
+
+        Args:
+            registry: Registry owning the model used for the batched encode
+            max_batch: Flush as soon as this many texts are waiting
+            max_wait_ms: Flush after waiting this long for the batch to fill
+        """
+        self.registry = registry
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.queue_depths = Histogram([0, 1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.max_queue_depth = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="embedding-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def submit(self, texts: List[str]) -> List[Future]:
+        """Queue texts for embedding; each future resolves to one vector"""
+        self._ensure_worker()
+        futures = []
+        for text in texts:
+            fut: Future = Future()
+            self._queue.put((text or "", fut))
+            futures.append(fut)
+        return futures
+
+    def embed(self, text: str) -> List[float]:
+        return self.submit([text])[0].result()
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        return [fut.result() for fut in self.submit(texts)]
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            depth = self._queue.qsize()
+            self.queue_depths.observe(depth)
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+            self.batch_sizes.observe(len(batch))
+            try:
+                vectors = self.registry.encode([text for text, _ in batch])
+            except Exception as e:
+                logger.error(f"Batched embedding of {len(batch)} texts failed: {e}")
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            for (_, fut), vector in zip(batch, vectors):
+                fut.set_result(vector)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "queue_depth_histogram": self.queue_depths.snapshot(),
+            "batch_size_histogram": self.batch_sizes.snapshot(),
+        }
+
+
+class CachedEmbedder:
+    def __init__(self, cache: EmbeddingCache, batcher: EmbeddingBatcher):
+        """Serve embeddings from the cache and send only misses to the batcher"""
+        self.cache = cache
+        self.batcher = batcher
+
+    def embed(self, text: str) -> List[float]:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        normalized = [normalize_text(t) for t in texts]
+        keys = [self.cache.key(t) for t in normalized]
+        results: List[Optional[List[float]]] = [self.cache.get(k) for k in keys]
+
+        # Only texts not seen before cost a forward pass (deduplicated per call)
+        pending: Dict[str, Future] = {}
+        for key, text, vector in zip(keys, normalized, results):
+            if vector is None and key not in pending:
+                pending[key] = self.batcher.submit([text])[0]
+        for key, fut in pending.items():
+            self.cache.put(key, fut.result())
+
+        return [
+            vector if vector is not None else pending[key].result()
+            for key, vector in zip(keys, results)
+        ]
+
+
+# Singleton instances
+embedding_registry = EmbeddingRegistry()
+embedding_batcher = EmbeddingBatcher(embedding_registry)
+embedding_cache = EmbeddingCache(embedding_registry.model_id)
+embedder = CachedEmbedder(embedding_cache, embedding_batcher)
+
+_registries: Dict[str, EmbeddingRegistry] = {embedding_registry.backend: embedding_registry}
+_registries_lock = threading.Lock()
+
+
+def get_registry(backend: str) -> EmbeddingRegistry:
+    """Registry for another backend (parity checks / benchmarks); loaded lazily"""
+    with _registries_lock:
+        if backend not in _registries:
+            _registries[backend] = EmbeddingRegistry(embedding_registry.model_name, backend)
+        return _registries[backend]
@@ -0,0 +1,27 @@
+"""
+Persistent cache of screening evaluations (see screening.evaluation_cache_key),
+scoped per job so editing a job description can drop its entries
+"""
+import os
+import logging
+
+from app.services.local_cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+evaluation_cache = LocalCache(
+    os.getenv("EVALUATION_CACHE_PATH", "./data/cache/evaluations.sqlite3"),
+    max_bytes=int(os.getenv("EVALUATION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    name="evaluation_cache",
+)
+
+
+def job_prefix(job_id: str) -> str:
+    return f"eval:{job_id}:"
+
+
+def invalidate_job(job_id: str) -> int:
+    """Drop every cached evaluation for a job, e.g. after its description changed"""
+    removed = evaluation_cache.delete_prefix(job_prefix(job_id))
+    logger.info(f"Invalidated {removed} cached evaluations for job_id {job_id}")
+    return removed
@@ -0,0 +1,227 @@
+"""
+Deterministic pre-screen ahead of LLM evaluation: scores a candidate's stored
+properties against the requirements stated in the job description (essential
+skills, years of experience range, education level)
+"""
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+FAST_FILTER_THRESHOLD = float(os.getenv("FAST_FILTER_THRESHOLD", "40"))
+
+# Weights of the sub-scores in the 0-100 fast-filter score
+SKILLS_WEIGHT = 0.6
+YEARS_WEIGHT = 0.25
+EDUCATION_WEIGHT = 0.15
+
+# Unknown values score neutral instead of failing the candidate
+UNKNOWN_SCORE = 0.5
+
+EDUCATION_LEVELS = [
+    (4, ("doctor", "phd", "ph.d")),
+    (3, ("master", "msc", "m.sc", "mba", "m.s.", "m.eng")),
+    (2, ("bachelor", "bsc", "b.sc", "b.s.", "b.eng", "b.tech", "undergraduate")),
+    (1, ("associate", "diploma", "high school", "secondary")),
+]
+
+_HEADER_RE = re.compile(r"^\s*#+\s*(.+?)\s*$")
+_SPLIT_RE = re.compile(r",|;|\band\b|\bor\b", re.I)
+# "HTML/CSS" lists two skills; "CI/CD" and "UI/UX" are one
+_SLASH_RE = re.compile(r"([\w.+#]{3,})\s*/\s*")
+_PAREN_RE = re.compile(r"\(([^)]*)\)")
+# Prose around skill names in generated bullets ("Strong proficiency in ...")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "in", "with", "for", "to", "on", "at",
+    "as", "by", "its", "their", "your", "our", "e.g", "eg", "i.e", "ie", "etc",
+    "such", "including", "like", "plus", "other", "related", "relevant",
+    "similar", "modern", "strong", "solid", "deep", "extensive", "proven",
+    "excellent", "good", "great", "working", "hands-on", "practical",
+    "proficiency", "proficient", "experience", "experienced", "expertise",
+    "familiarity", "familiar", "knowledge", "understanding", "ability",
+    "skills", "skill", "years", "year", "least", "minimum", "preferred",
+    "required", "must", "have", "be", "is", "are", "ecosystem", "concepts",
+    "principles", "practices", "using", "building", "writing",
+}
+
+
+def _norm(text: str) -> str:
+    """Lowercase skill text; "React.js" and "React" compare equal"""
+    text = re.sub(r"[^\w+#.]+", " ", text.lower())
+    return re.sub(r"\s+", " ", re.sub(r"\.js\b", "", text)).strip(" .")
+
+
+def _is_skill_word(word: str) -> bool:
+    """Capitalized or technical looking (JavaScript, AWS, C++, Node.js, S3)"""
+    if word.lower().strip(".") in _STOPWORDS:
+        return False
+    return any(c.isupper() for c in word) or bool(re.search(r"[\d+#]|\w\.\w", word))
+
+
+def extract_skills(line: str) -> List[str]:
+    """
+    Skill names in one requirements bullet. Short list items ("Python",
+    "version control") are skills as they are; in prose bullets only the
+    capitalized or technical terms count, and parenthesized examples such as
+    "(Redux, React Router)" are listed separately.
+    """
+    line = line.lstrip("-*• ").replace("**", "")
+    # "Frontend: React, TypeScript" lists skills after the label
+    if re.match(r"^[^:()]{1,30}:", line):
+        line = line.split(":", 1)[1]
+    pieces = []
+    for part in [_PAREN_RE.sub(" ", line), *_PAREN_RE.findall(line)]:
+        pieces.extend(_SPLIT_RE.split(_SLASH_RE.sub(r"\1, ", part)))
+
+    skills: List[str] = []
+    for piece in pieces:
+        words = [w.strip(".,:;!?\"'") for w in piece.split()]
+        words = [w for w in words if w]
+        if not words:
+            continue
+        if len(words) <= 3 and not any(w.lower() in _STOPWORDS for w in words):
+            skills.append(_norm(" ".join(words)))
+            continue
+        run: List[str] = []
+        for word in words + [""]:
+            if word and _is_skill_word(word):
+                run.append(word)
+            elif run:
+                skills.append(_norm(" ".join(run)))
+                run = []
+    return [s for s in skills if s]
+
+
+def _sections(job_desc: str) -> Dict[str, List[str]]:
+    """Lines of the job description grouped under their lowercased markdown header"""
+    sections: Dict[str, List[str]] = {}
+    current = ""
+    for line in job_desc.splitlines():
+        header = _HEADER_RE.match(line)
+        if header:
+            current = header.group(1).lower()
+            continue
+        if line.strip():
+            sections.setdefault(current, []).append(line.strip())
+    return sections
+
+
+def education_level(text: Optional[str]) -> Optional[int]:
+    if not text:
+        return None
+    lowered = text.lower()
+    for level, keywords in EDUCATION_LEVELS:
+        if any(k in lowered for k in keywords):
+            return level
+    return None
+
+
+def parse_job_requirements(job_desc: str) -> Dict[str, Any]:
+    """
+    Read essential skills, the experience range and the education level from
+    the sections of a generated job description (see jobs.job_desc_prompt)
+    """
+    skills: List[str] = []
+    years_text = education_text = ""
+    for header, lines in _sections(job_desc or "").items():
+        if "nice" in header:
+            continue
+        if "skill" in header or "required" in header or "must" in header:
+            for line in lines:
+                skills.extend(extract_skills(line))
+        elif "year" in header or "experience needed" in header:
+            years_text += " " + " ".join(lines)
+        elif "education" in header:
+            education_text += " " + " ".join(lines)
+
+    min_years = max_years = None
+    years_text = years_text.replace("**", "")
+    match = re.search(r"(\d+)\s*(?:-|–|to)\s*(\d+)", years_text)
+    if match:
+        min_years, max_years = int(match.group(1)), int(match.group(2))
+    else:
+        match = re.search(r"(\d+)", years_text)
+        if match:
+            min_years = int(match.group(1))
+
+    return {
+        "essential_skills": list(dict.fromkeys(skills)),
+        "min_years": min_years,
+        "max_years": max_years,
+        "education_level": education_level(education_text),
+    }
+
+
+def _skills_score(required: List[str], candidate: Dict[str, Any]) -> Dict[str, Any]:
+    if not required:
+        return {"score": 1.0, "matched": [], "missing": []}
+    have = {_norm(s) for s in candidate.get("skills") or [] if s}
+    summary = " " + _norm(candidate.get("resume_summary") or "") + " "
+    matched, missing = [], []
+    for skill in required:
+        found = skill in have or any(
+            re.search(rf"(^|\s){re.escape(skill)}(\s|$)", h) for h in have
+        )
+        if found or f" {skill} " in summary:
+            matched.append(skill)
+        else:
+            missing.append(skill)
+    return {
+        "score": len(matched) / len(required),
+        "matched": matched,
+        "missing": missing,
+    }
+
+
+def _years_score(
+    years: Optional[int], min_years: Optional[int], max_years: Optional[int]
+) -> float:
+    if min_years is None:
+        return 1.0
+    if years is None:
+        return UNKNOWN_SCORE
+    if years < min_years:
+        return max(0.0, 1 - (min_years - years) / max(min_years, 1))
+    if max_years is not None and years > max_years + 5:
+        return 0.8  # likely over-qualified for the stated range
+    return 1.0
+
+
+def _education_score(candidate: Dict[str, Any], required: Optional[int]) -> float:
+    if required is None:
+        return 1.0
+    level = education_level(candidate.get("highest_education"))
+    for edu in candidate.get("education") or []:
+        degree = education_level((edu or {}).get("qualification"))
+        if degree is not None and (level is None or degree > level):
+            level = degree
+    if level is None:
+        return UNKNOWN_SCORE
+    if level >= required:
+        return 1.0
+    return 0.5 if level == required - 1 else 0.0
+
+
+def score_candidate(
+    candidate: Dict[str, Any], requirements: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Fast-filter score (0-100) of a candidate with its sub-scores"""
+    skills = _skills_score(requirements["essential_skills"], candidate)
+    years = _years_score(
+        candidate.get("years_of_experience"),
+        requirements["min_years"],
+        requirements["max_years"],
+    )
+    education = _education_score(candidate, requirements["education_level"])
+    score = 100 * (
+        SKILLS_WEIGHT * skills["score"]
+        + YEARS_WEIGHT * years
+        + EDUCATION_WEIGHT * education
+    )
+    return {
+        "score": round(score, 1),
+        "skills_score": round(skills["score"], 3),
+        "years_score": round(years, 3),
+        "education_score": round(education, 3),
+        "matched_skills": skills["matched"],
+        "missing_skills": skills["missing"],
+    }
@@ -0,0 +1,86 @@
+"""
+Per-job processing manifest stored next to the uploaded PDFs, so re-runs of
+resume processing only touch new or changed files
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".manifest.json"
+
+# Lifecycle of a file: pending -> processed (parsed, not yet stored) -> inserted,
+# or failed at any point
+STATE_PENDING = "pending"
+STATE_FAILED = "failed"
+STATE_PROCESSED = "processed"
+STATE_INSERTED = "inserted"
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class JobManifest:
+    def __init__(self, folder_path: str, files: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Args:
+            folder_path: The job's upload folder; the manifest lives inside it
+            files: filename -> {sha256, state, candidate_id, uuid, error, updated_at}
+        """
+        self.path = Path(folder_path) / MANIFEST_NAME
+        self.files: Dict[str, Dict[str, Any]] = files or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, folder_path: str) -> "JobManifest":
+        path = Path(folder_path) / MANIFEST_NAME
+        if path.exists():
+            try:
+                data = json.loads(path.read_text())
+                return cls(folder_path, data.get("files", {}))
+            except (OSError, ValueError) as e:
+                logger.error(f"Unreadable manifest {path}, starting fresh: {e}")
+        return cls(folder_path)
+
+    def get(self, filename: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.files.get(filename, {}))
+
+    def needs_processing(self, filename: str, sha256: str, force: bool = False) -> bool:
+        """True unless this exact file content was already inserted"""
+        if force:
+            return True
+        entry = self.get(filename)
+        return not (
+            entry.get("sha256") == sha256 and entry.get("state") == STATE_INSERTED
+        )
+
+    def mark(self, filename: str, save: bool = True, **fields: Any) -> None:
+        """Update a file's entry and (by default) persist the manifest"""
+        with self._lock:
+            entry = self.files.setdefault(filename, {})
+            entry.update(fields)
+            entry["updated_at"] = datetime.now(timezone.utc).isoformat()
+            if save:
+                self._save()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        # Write-then-rename so a crash never leaves a half-written manifest
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"files": self.files}, indent=2))
+        os.replace(tmp, self.path)
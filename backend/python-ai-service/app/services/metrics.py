@@ -0,0 +1,127 @@
+"""
+Lightweight in-process metrics (histograms, per-request stage timings) exposed
+through the stats endpoints
+"""
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Sequence
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float], window: int = 2048):
+        """
+        Cumulative bucket counts plus a window of recent samples for percentiles
+
+        Args:
+            buckets: Sorted upper bounds of the buckets; larger values go to "+Inf"
+            window: How many recent observations to keep for p50/p95/p99
+        """
+        self.buckets = list(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._recent = deque(maxlen=window)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+            else:
+                self._counts[-1] += 1
+            self._recent.append(value)
+            self._count += 1
+            self._sum += value
+
+    @staticmethod
+    def _percentile(ordered: List[float], q: float) -> Optional[float]:
+        if not ordered:
+            return None
+        idx = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            ordered = sorted(self._recent)
+            labels = [f"le_{b:g}" for b in self.buckets] + ["le_inf"]
+            return {
+                "count": self._count,
+                "sum": round(self._sum, 6),
+                "buckets": dict(zip(labels, self._counts)),
+                "p50": self._percentile(ordered, 0.50),
+                "p95": self._percentile(ordered, 0.95),
+                "p99": self._percentile(ordered, 0.99),
+            }
+
+
+# Upper bounds (seconds) for stage latency histograms
+LATENCY_BUCKETS = [0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+
+
+class HistogramFamily:
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS, window: int = 2048):
+        """One Histogram per label (e.g. pipeline stage), created on first use"""
+        self.buckets = list(buckets)
+        self.window = window
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label: str, value: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(label)
+            if histogram is None:
+                histogram = Histogram(self.buckets, self.window)
+                self._histograms[label] = histogram
+        histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {label: h.snapshot() for label, h in sorted(histograms.items())}
+
+
+class StageTimings:
+    def __init__(self, histograms: Optional[HistogramFamily] = None):
+        """
+        Timing spans of one request, aggregated per stage. Every span is also
+        observed in the shared histograms, if given.
+        """
+        self.histograms = histograms
+        self._stages: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._stages.setdefault(stage, []).append(seconds)
+        if self.histograms is not None:
+            self.histograms.observe(stage, seconds)
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def summary(self) -> Dict[str, Any]:
+        """Per stage: span count, total, mean and max seconds, plus wall time"""
+        with self._lock:
+            stages = {name: list(values) for name, values in self._stages.items()}
+        return {
+            "wall_seconds": round(time.perf_counter() - self._started, 4),
+            "stages": {
+                name: {
+                    "count": len(values),
+                    "total_seconds": round(sum(values), 4),
+                    "mean_seconds": round(sum(values) / len(values), 4),
+                    "max_seconds": round(max(values), 4),
+                }
+                for name, values in stages.items()
+            },
+        }
@@ -0,0 +1,134 @@
+"""
+Local PDF text extraction for text-layer resumes, with quality heuristics that
+decide whether the result is good enough to skip LlamaParse
+"""
+import os
+import re
+import logging
+from typing import Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+LOCAL_PDF_MIN_CHARS_PER_PAGE = int(os.getenv("LOCAL_PDF_MIN_CHARS_PER_PAGE", "300"))
+LOCAL_PDF_MIN_ALPHA_RATIO = float(os.getenv("LOCAL_PDF_MIN_ALPHA_RATIO", "0.6"))
+LOCAL_PDF_MIN_SECTIONS = int(os.getenv("LOCAL_PDF_MIN_SECTIONS", "2"))
+
+SECTION_HEADERS = {
+    "summary",
+    "profile",
+    "professional summary",
+    "about me",
+    "objective",
+    "career objective",
+    "experience",
+    "work experience",
+    "professional experience",
+    "employment",
+    "employment history",
+    "work history",
+    "internships",
+    "education",
+    "academic background",
+    "qualifications",
+    "skills",
+    "technical skills",
+    "core skills",
+    "key skills",
+    "competencies",
+    "projects",
+    "personal projects",
+    "certifications",
+    "certificates",
+    "licenses",
+    "achievements",
+    "awards",
+    "honors",
+    "publications",
+    "languages",
+    "interests",
+    "volunteering",
+    "volunteer experience",
+    "leadership",
+    "activities",
+    "references",
+    "contact",
+}
+
+_BULLET_RE = re.compile(r"^[•●▪◦‣⁃∙\-\*·]\s*")
+
+
+def header_title(line: str) -> str:
+    """Return the section title if the line looks like a resume section header"""
+    candidate = line.strip().rstrip(":").strip()
+    if not candidate or len(candidate) > 40:
+        return ""
+    if candidate.lower() in SECTION_HEADERS:
+        return candidate
+    words = candidate.split()
+    # Short ALL-CAPS lines are headers in most resume templates
+    if len(words) <= 4 and candidate.isupper() and any(c.isalpha() for c in candidate):
+        return candidate
+    return ""
+
+
+def to_markdown(pages: List[str]) -> Tuple[str, List[str]]:
+    """
+    Turn raw page text into markdown-ish text: section headers become '##'
+    headings and bullet glyphs become '-' items.
+
+    Returns:
+        (markdown text, section titles found)
+    """
+    out: List[str] = []
+    sections: List[str] = []
+    for page in pages:
+        for raw in page.splitlines():
+            line = raw.strip()
+            if not line:
+                continue
+            title = header_title(line)
+            if title:
+                sections.append(title)
+                out.append(f"\n## {title.title() if title.isupper() else title}")
+            elif _BULLET_RE.match(line):
+                out.append(f"- {_BULLET_RE.sub('', line)}")
+            else:
+                out.append(line)
+        out.append("")
+    return "\n".join(out).strip(), sections
+
+
+def assess_quality(text: str, page_count: int, sections: List[str]) -> Dict[str, Any]:
+    """Heuristics separating clean text-layer PDFs from scanned / garbled ones"""
+    visible = re.sub(r"\s+", "", text)
+    chars_per_page = len(visible) / max(1, page_count)
+    alpha_ratio = sum(c.isalpha() for c in visible) / max(1, len(visible))
+    known_sections = {s.lower() for s in sections if s.lower() in SECTION_HEADERS}
+    ok = (
+        chars_per_page >= LOCAL_PDF_MIN_CHARS_PER_PAGE
+        and alpha_ratio >= LOCAL_PDF_MIN_ALPHA_RATIO
+        and len(known_sections) >= LOCAL_PDF_MIN_SECTIONS
+    )
+    return {
+        "ok": ok,
+        "pages": page_count,
+        "chars_per_page": round(chars_per_page, 1),
+        "alpha_ratio": round(alpha_ratio, 3),
+        "sections_found": len(known_sections),
+    }
+
+
+def extract_local(file_path: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Extract a PDF's text layer locally.
+
+    Returns:
+        (markdown-ish text, quality report with an "ok" verdict)
+    """
+    # Imported lazily so the service still runs (LlamaParse only) without pypdf
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    pages = [page.extract_text() or "" for page in reader.pages]
+    text, sections = to_markdown(pages)
+    return text, assess_quality(text, len(pages), sections)
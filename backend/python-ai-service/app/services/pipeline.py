@@ -0,0 +1,142 @@
+"""
+Staged pipeline executor: every stage has its own bounded worker pool, so
+different items can be in different stages at the same time
+"""
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+class PipelineDone:
+    def __init__(self, value: Any):
+        """Returned by a stage to finish an item early, skipping the remaining stages"""
+        self.value = value
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        concurrency: int = 1,
+        with_index: bool = False,
+    ):
+        """
+        Args:
+            name: Stage name used in callbacks and logs
+            fn: Called with the previous stage's output, returns this stage's output
+            concurrency: Max items running this stage at once
+            with_index: Call fn as fn(index, value) so it can look up per-item state
+        """
+        self.name = name
+        self.fn = fn
+        self.concurrency = max(1, concurrency)
+        self.with_index = with_index
+
+
+class StagedPipeline:
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        on_stage_done: Optional[Callable[[int, str, Any, float], None]] = None,
+        on_error: Optional[Callable[[int, str, BaseException], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        Args:
+            stages: Stages run in order for every item
+            on_stage_done: Called as (index, stage name, output, seconds) after each stage
+            on_error: Called as (index, stage name, exception) when an item fails;
+                a failed item skips its remaining stages
+            should_cancel: Checked before every stage; once it returns True the
+                remaining work fails with PipelineCancelled
+        """
+        self.stages = list(stages)
+        self.on_stage_done = on_stage_done
+        self.on_error = on_error
+        self.should_cancel = should_cancel
+
+    def run(
+        self, items: Sequence[Any], start_stages: Optional[Sequence[int]] = None
+    ) -> List[Tuple[Any, Optional[BaseException]]]:
+        """
+        Push every item through all stages.
+
+        Args:
+            items: Inputs of the first stage (or of the item's start stage)
+            start_stages: Optional stage index per item to start from, e.g. to
+                resume from a checkpoint; len(stages) means the item is done
+
+        Returns:
+            One (output, error) pair per item, in input order
+        """
+        if not self.stages:
+            return [(item, None) for item in items]
+
+        executors = [
+            ThreadPoolExecutor(max_workers=s.concurrency, thread_name_prefix=s.name)
+            for s in self.stages
+        ]
+        done = [Future() for _ in items]
+        callback_lock = threading.Lock()
+
+        def submit(idx: int, stage_idx: int, value: Any) -> None:
+            stage = self.stages[stage_idx]
+            fut = executors[stage_idx].submit(self._timed, stage, idx, value)
+            fut.add_done_callback(lambda f: advance(idx, stage_idx, f))
+
+        def advance(idx: int, stage_idx: int, fut: Future) -> None:
+            stage = self.stages[stage_idx]
+            try:
+                value, seconds = fut.result()
+            except BaseException as e:
+                with callback_lock:
+                    if self.on_error:
+                        self._safe(self.on_error, idx, stage.name, e)
+                done[idx].set_result((None, e))
+                return
+            finished = isinstance(value, PipelineDone)
+            if finished:
+                value = value.value
+            with callback_lock:
+                if self.on_stage_done:
+                    self._safe(self.on_stage_done, idx, stage.name, value, seconds)
+            if not finished and stage_idx + 1 < len(self.stages):
+                submit(idx, stage_idx + 1, value)
+            else:
+                done[idx].set_result((value, None))
+
+        try:
+            for idx, item in enumerate(items):
+                start = start_stages[idx] if start_stages else 0
+                if start >= len(self.stages):
+                    done[idx].set_result((item, None))
+                else:
+                    submit(idx, start, item)
+            return [f.result() for f in done]
+        finally:
+            for ex in executors:
+                ex.shutdown(wait=True)
+
+    def _timed(self, stage: Stage, idx: int, value: Any) -> Tuple[Any, float]:
+        if self.should_cancel and self.should_cancel():
+            raise PipelineCancelled(f"cancelled before {stage.name}")
+        started = time.perf_counter()
+        out = stage.fn(idx, value) if stage.with_index else stage.fn(value)
+        return out, time.perf_counter() - started
+
+    @staticmethod
+    def _safe(callback: Callable, *args) -> None:
+        # A broken progress callback must not take the pipeline down
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"Pipeline callback failed: {e}")
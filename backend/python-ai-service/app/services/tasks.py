@@ -0,0 +1,360 @@
+"""
+SQLite-backed background task store and runner, so long-running batch work
+(resume processing) does not hold an HTTP request open and survives restarts.
+Several worker processes may share the store: a task runs only in the worker
+that claimed it, and is handed to another one only once its owner stops
+heartbeating.
+"""
+import os
+import json
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TASK_DB_PATH = os.getenv("TASK_DB_PATH", "./data/tasks.sqlite3")
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "1"))
+# Owners refresh their running tasks this often; a task whose heartbeat is older
+# than TASK_STALE_SECONDS is taken to be orphaned and may be claimed again
+TASK_HEARTBEAT_SECONDS = float(os.getenv("TASK_HEARTBEAT_SECONDS", "15"))
+TASK_STALE_SECONDS = float(os.getenv("TASK_STALE_SECONDS", "90"))
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class TaskStore:
+    def __init__(self, db_path: str = TASK_DB_PATH):
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    heartbeat_at TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS task_files (
+                    task_id TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    stage TEXT,
+                    status TEXT,
+                    error TEXT,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (task_id, filename)
+                );
+                """
+            )
+            # Stores created before task ownership existed
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(tasks)")}
+            for column in ("owner", "heartbeat_at"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} TEXT")
+
+    @contextmanager
+    def _conn(self):
+        # One short-lived connection per operation keeps this safe across threads
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def create(self, kind: str, params: Dict[str, Any]) -> str:
+        task_id = uuid.uuid4().hex
+        now = _now()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO tasks (task_id, kind, params, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (task_id, kind, json.dumps(params), STATUS_QUEUED, now, now),
+            )
+        return task_id
+
+    def set_status(
+        self,
+        task_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = ?, result = COALESCE(?, result), error = ?, "
+                "updated_at = ? WHERE task_id = ?",
+                (
+                    status,
+                    json.dumps(result, default=str) if result is not None else None,
+                    error,
+                    _now(),
+                    task_id,
+                ),
+            )
+
+    def claim(self, task_id: str, owner: str) -> bool:
+        """Atomically take a queued, unowned task; False if another worker has it"""
+        now = _now()
+        with self._conn() as conn:
+            cur = conn.execute(
+                "UPDATE tasks SET status = ?, owner = ?, heartbeat_at = ?, "
+                "updated_at = ? WHERE task_id = ? AND status = ? AND owner IS NULL",
+                (STATUS_RUNNING, owner, now, now, task_id, STATUS_QUEUED),
+            )
+            return cur.rowcount > 0
+
+    def heartbeat(self, owner: str) -> int:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "UPDATE tasks SET heartbeat_at = ? WHERE owner = ? AND status = ?",
+                (_now(), owner, STATUS_RUNNING),
+            )
+            return cur.rowcount
+
+    def release_stale(self, stale_seconds: float = TASK_STALE_SECONDS) -> int:
+        """Re-queue running tasks whose owner stopped heartbeating"""
+        cutoff = (
+            datetime.now(timezone.utc) - timedelta(seconds=stale_seconds)
+        ).isoformat()
+        with self._conn() as conn:
+            cur = conn.execute(
+                "UPDATE tasks SET status = ?, owner = NULL, updated_at = ? "
+                "WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (STATUS_QUEUED, _now(), STATUS_RUNNING, cutoff),
+            )
+            return cur.rowcount
+
+    def request_cancel(self, task_id: str) -> bool:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "UPDATE tasks SET cancel_requested = 1, updated_at = ? "
+                "WHERE task_id = ? AND status IN (?, ?)",
+                (_now(), task_id, STATUS_QUEUED, STATUS_RUNNING),
+            )
+            return cur.rowcount > 0
+
+    def cancel_requested(self, task_id: str) -> bool:
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT cancel_requested FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+            return bool(row and row["cancel_requested"])
+
+    def update_file(
+        self,
+        task_id: str,
+        filename: str,
+        stage: str,
+        status: str,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO task_files (task_id, filename, stage, status, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(task_id, filename) DO UPDATE SET "
+                "stage = excluded.stage, status = excluded.status, "
+                "error = excluded.error, updated_at = excluded.updated_at",
+                (task_id, filename, stage, status, error, _now()),
+            )
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT * FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            files = conn.execute(
+                "SELECT filename, stage, status, error, updated_at FROM task_files "
+                "WHERE task_id = ? ORDER BY filename",
+                (task_id,),
+            ).fetchall()
+        file_list = [dict(f) for f in files]
+        counts: Dict[str, int] = {}
+        for f in file_list:
+            counts[f["status"]] = counts.get(f["status"], 0) + 1
+        return {
+            "task_id": row["task_id"],
+            "kind": row["kind"],
+            "params": json.loads(row["params"]),
+            "status": row["status"],
+            "cancel_requested": bool(row["cancel_requested"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "error": row["error"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "counts": {"total": len(file_list), **counts},
+            "files": file_list,
+        }
+
+    def unclaimed(self) -> List[Dict[str, Any]]:
+        """Queued tasks no worker has claimed yet"""
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT task_id, kind, params, cancel_requested FROM tasks "
+                "WHERE status = ? AND owner IS NULL ORDER BY created_at",
+                (STATUS_QUEUED,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+
+class TaskContext:
+    def __init__(self, store: TaskStore, task_id: str):
+        """Handed to task handlers for progress reporting and cancellation checks"""
+        self.store = store
+        self.task_id = task_id
+
+    def file_event(
+        self, filename: str, stage: str, status: str, error: Optional[str] = None
+    ) -> None:
+        self.store.update_file(self.task_id, filename, stage, status, error)
+
+    def cancelled(self) -> bool:
+        return self.store.cancel_requested(self.task_id)
+
+
+TaskHandler = Callable[[Dict[str, Any], TaskContext], Dict[str, Any]]
+
+
+class TaskRunner:
+    def __init__(self, store: TaskStore, workers: int = TASK_WORKERS):
+        self.store = store
+        self.workers = max(1, workers)
+        self._handlers: Dict[str, TaskHandler] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Identifies this process in the store's owner column
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._submitted: set = set()  # task_ids already in this process's pool
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def register(self, kind: str, handler: TaskHandler) -> None:
+        self._handlers[kind] = handler
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="task"
+                )
+            return self._executor
+
+    def _enqueue(self, task_id: str, kind: str, params: Dict[str, Any]) -> bool:
+        with self._lock:
+            if task_id in self._submitted:
+                return False
+            self._submitted.add(task_id)
+        self._pool().submit(self._run, task_id, kind, params)
+        return True
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> str:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for task kind {kind!r}")
+        task_id = self.store.create(kind, params)
+        self._enqueue(task_id, kind, params)
+        self._start_heartbeat()
+        logger.info(f"Queued task {task_id} ({kind})")
+        return task_id
+
+    def resume_unfinished(self) -> int:
+        """
+        Re-queue tasks whose owner stopped heartbeating and pick up unclaimed
+        ones. Tasks a live sibling worker is running are left alone; for the
+        rest, claim() in _run decides which worker runs each.
+        """
+        released = self.store.release_stale()
+        if released:
+            logger.info(f"Released {released} tasks of workers that stopped")
+        resumed = 0
+        for row in self.store.unclaimed():
+            if row["cancel_requested"]:
+                self.store.set_status(row["task_id"], STATUS_CANCELLED)
+                continue
+            if row["kind"] not in self._handlers:
+                continue
+            if self._enqueue(row["task_id"], row["kind"], json.loads(row["params"])):
+                resumed += 1
+        if resumed:
+            logger.info(f"Resumed {resumed} unfinished tasks")
+        self._start_heartbeat()
+        return resumed
+
+    def _start_heartbeat(self) -> None:
+        with self._lock:
+            if self._heartbeat is not None:
+                return
+            self._heartbeat = threading.Thread(
+                target=self._heartbeat_loop, name="task-heartbeat", daemon=True
+            )
+        self._heartbeat.start()
+
+    def _heartbeat_loop(self) -> None:
+        # Also adopts tasks orphaned by a worker that died after our startup
+        while True:
+            time.sleep(TASK_HEARTBEAT_SECONDS)
+            try:
+                self.store.heartbeat(self.owner)
+                self.resume_unfinished()
+            except Exception as e:
+                logger.error(f"Task heartbeat failed: {e}")
+
+    def _run(self, task_id: str, kind: str, params: Dict[str, Any]) -> None:
+        try:
+            self._run_claimed(task_id, kind, params)
+        finally:
+            with self._lock:
+                self._submitted.discard(task_id)
+
+    def _run_claimed(self, task_id: str, kind: str, params: Dict[str, Any]) -> None:
+        ctx = TaskContext(self.store, task_id)
+        if ctx.cancelled():
+            self.store.set_status(task_id, STATUS_CANCELLED)
+            return
+        if not self.store.claim(task_id, self.owner):
+            logger.info(f"Task {task_id} is claimed by another worker")
+            return
+        try:
+            result = self._handlers[kind](params, ctx)
+        except Exception as e:
+            if ctx.cancelled():
+                logger.info(f"Task {task_id} cancelled")
+                self.store.set_status(task_id, STATUS_CANCELLED, error=str(e))
+            else:
+                logger.error(f"Task {task_id} ({kind}) failed: {e}")
+                self.store.set_status(task_id, STATUS_FAILED, error=str(e))
+        else:
+            status = STATUS_CANCELLED if ctx.cancelled() else STATUS_COMPLETED
+            self.store.set_status(task_id, status, result=result)
+
+
+# Singleton instances
+task_store = TaskStore()
+task_runner = TaskRunner(task_store)
@@ -0,0 +1,123 @@
+"""
+Bounded-memory PDF writes: uploads are streamed to a temp file in chunks,
+hashed on the way, checked for PDF magic bytes and byte limits, and renamed
+into place only once complete
+"""
+import os
+import uuid
+import hashlib
+from pathlib import Path
+from typing import Iterable, Optional
+
+from starlette.responses import JSONResponse
+
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_MAX_REQUEST_BYTES = int(
+    os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(500 * 1024 * 1024))
+)
+
+PDF_MAGIC = b"%PDF-"
+
+
+class UploadRejected(ValueError):
+    pass
+
+
+class ByteBudget:
+    def __init__(self, limit: int):
+        """Byte allowance shared by every file of one request"""
+        self.limit = limit
+        self.used = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.used >= self.limit
+
+    def consume(self, n: int) -> None:
+        self.used += n
+        if self.used > self.limit:
+            raise UploadRejected(f"request exceeds {self.limit} bytes")
+
+
+class RequestSizeLimit:
+    def __init__(self, app, limit: int, paths: Iterable[str]):
+        """
+        ASGI middleware answering 413 when a request to one of `paths`
+        declares a Content-Length over `limit`, before its body is read.
+        Multipart forms are otherwise spooled completely before the endpoint
+        runs; bodies without a Content-Length are left to ByteBudget.
+        """
+        self.app = app
+        self.limit = limit
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.paths:
+            length = dict(scope["headers"]).get(b"content-length", b"")
+            if length.isdigit() and int(length) > self.limit:
+                response = JSONResponse(
+                    {"detail": f"request exceeds {self.limit} bytes"},
+                    status_code=413,
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class AtomicPdfWriter:
+    def __init__(
+        self,
+        dest_dir: Path,
+        filename: str,
+        max_bytes: int = UPLOAD_MAX_FILE_BYTES,
+        budget: Optional[ByteBudget] = None,
+    ):
+        """
+        Write one PDF through a hidden temp file in dest_dir.
+
+        Args:
+            dest_dir: Final directory (temp file lives there too, so rename is atomic)
+            filename: Final file name (already sanitized)
+            max_bytes: Per-file limit
+            budget: Optional per-request limit shared with other files
+        """
+        self.final_path = Path(dest_dir) / filename
+        self.tmp_path = Path(dest_dir) / f".{filename}.{uuid.uuid4().hex}.part"
+        self.max_bytes = max_bytes
+        self.budget = budget
+        self.size = 0
+        self._head = b""
+        self._sha = hashlib.sha256()
+        self._out = open(self.tmp_path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        if len(self._head) < len(PDF_MAGIC):
+            self._head += chunk[: len(PDF_MAGIC) - len(self._head)]
+            if not PDF_MAGIC.startswith(self._head):
+                raise UploadRejected("not a PDF (bad magic bytes)")
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadRejected(f"file exceeds {self.max_bytes} bytes")
+        if self.budget is not None:
+            self.budget.consume(len(chunk))
+        self._sha.update(chunk)
+        self._out.write(chunk)
+
+    def commit(self) -> str:
+        """Move the complete file into place and return its sha256"""
+        if self._head != PDF_MAGIC:
+            self.abort()
+            raise UploadRejected("not a PDF (bad magic bytes)")
+        self._out.flush()
+        os.fsync(self._out.fileno())
+        self._out.close()
+        os.replace(self.tmp_path, self.final_path)
+        return self._sha.hexdigest()
+
+    def abort(self) -> None:
+        if not self._out.closed:
+            self._out.close()
+        self.tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,246 @@
+"""
+Streaming ZIP reader: walks local file headers as bytes arrive, so archives can
+be extracted without buffering them or needing the central directory, with
+zip-bomb limits checked while decompressing
+"""
+import os
+import zlib
+import struct
+from typing import AsyncIterator, Optional
+
+from app.services.uploads import UploadRejected
+
+ZIP_MAX_RATIO = float(os.getenv("ZIP_MAX_RATIO", "100"))
+ZIP_MAX_TOTAL_BYTES = int(os.getenv("ZIP_MAX_TOTAL_BYTES", str(5 * 1024**3)))
+ZIP_MAX_MEMBERS = int(os.getenv("ZIP_MAX_MEMBERS", "10000"))
+
+_LOCAL_HEADER = 0x04034B50
+_CENTRAL_HEADER = 0x02014B50
+_END_OF_CENTRAL_DIR = 0x06054B50
+_DATA_DESCRIPTOR = 0x08074B50
+_ZIP64_EXTRA = 0x0001
+
+_FLAG_ENCRYPTED = 0x1
+_FLAG_DATA_DESCRIPTOR = 0x8
+
+_METHOD_STORED = 0
+_METHOD_DEFLATED = 8
+
+_READ_SIZE = 64 * 1024
+
+
+class ZipRejected(UploadRejected):
+    """The archive as a whole is malformed or over a limit"""
+
+
+class ZipMember:
+    def __init__(
+        self,
+        reader: "ZipStreamReader",
+        name: str,
+        flags: int,
+        method: int,
+        crc: int,
+        compressed_size: Optional[int],
+        zip64: bool,
+    ):
+        self.reader = reader
+        self.name = name
+        self.flags = flags
+        self.method = method
+        self.crc = crc
+        self.compressed_size = compressed_size
+        self.zip64 = zip64
+        self._data: Optional[AsyncIterator[bytes]] = None
+
+    def chunks(self) -> AsyncIterator[bytes]:
+        """
+        Decompressed member data. Iterating again resumes where the last loop
+        stopped, so a reader that gives up half way can still skip the rest.
+        """
+        if self._data is None:
+            self._data = self.reader._member_data(self)
+        return self._data
+
+    async def skip(self) -> None:
+        async for _ in self.chunks():
+            pass
+
+
+class ZipStreamReader:
+    def __init__(self, source: AsyncIterator[bytes]):
+        """
+        Args:
+            source: Async iterator of raw archive bytes (e.g. request.stream())
+        """
+        self._source = source.__aiter__()
+        self._buf = bytearray()
+        self._eof = False
+        self.total_uncompressed = 0
+        self.members = 0
+
+    async def _fill(self, n: int) -> bool:
+        while len(self._buf) < n and not self._eof:
+            try:
+                self._buf += await self._source.__anext__()
+            except StopAsyncIteration:
+                self._eof = True
+        return len(self._buf) >= n
+
+    async def _read_exact(self, n: int) -> bytes:
+        if not await self._fill(n):
+            raise ZipRejected("truncated ZIP archive")
+        out = bytes(self._buf[:n])
+        del self._buf[:n]
+        return out
+
+    async def _read_some(self, limit: int) -> bytes:
+        if not self._buf:
+            await self._fill(1)
+        out = bytes(self._buf[:limit])
+        del self._buf[:limit]
+        return out
+
+    async def members_iter(self) -> AsyncIterator[ZipMember]:
+        """Yield each member in archive order; unconsumed members are skipped"""
+        while True:
+            if not await self._fill(4):
+                return
+            (signature,) = struct.unpack("<I", bytes(self._buf[:4]))
+            if signature in (_CENTRAL_HEADER, _END_OF_CENTRAL_DIR):
+                return  # local entries done; the central directory is not needed
+            if signature != _LOCAL_HEADER:
+                raise ZipRejected("not a ZIP archive (bad local header)")
+
+            header = await self._read_exact(30)
+            (_, _, flags, method, _, _, crc, comp_size, _, name_len, extra_len) = (
+                struct.unpack("<IHHHHHIIIHH", header)
+            )
+            raw_name = await self._read_exact(name_len)
+            extra = await self._read_exact(extra_len)
+            name = raw_name.decode("utf-8" if flags & 0x800 else "cp437", "replace")
+
+            zip64 = False
+            pos = 0
+            while pos + 4 <= len(extra):
+                tag, size = struct.unpack("<HH", extra[pos : pos + 4])
+                if tag == _ZIP64_EXTRA:
+                    zip64 = True
+                    if comp_size == 0xFFFFFFFF and size >= 16:
+                        (_, comp_size) = struct.unpack("<QQ", extra[pos + 4 : pos + 20])
+                pos += 4 + size
+
+            self.members += 1
+            if self.members > ZIP_MAX_MEMBERS:
+                raise ZipRejected(f"ZIP has more than {ZIP_MAX_MEMBERS} members")
+            if flags & _FLAG_ENCRYPTED:
+                raise ZipRejected(f"encrypted ZIP member {name!r} is not supported")
+            if method not in (_METHOD_STORED, _METHOD_DEFLATED):
+                raise ZipRejected(
+                    f"unsupported compression method {method} in {name!r}"
+                )
+            has_descriptor = bool(flags & _FLAG_DATA_DESCRIPTOR)
+            if has_descriptor and method == _METHOD_STORED:
+                raise ZipRejected(
+                    f"stored member {name!r} without size is not supported"
+                )
+
+            member = ZipMember(
+                self,
+                name,
+                flags,
+                method,
+                crc,
+                None if has_descriptor else comp_size,
+                zip64,
+            )
+            yield member
+            await member.skip()
+
+    async def _member_data(self, member: ZipMember) -> AsyncIterator[bytes]:
+        inflater = None
+        if member.method == _METHOD_DEFLATED:
+            inflater = zlib.decompressobj(-15)  # raw deflate, no zlib header
+        remaining = member.compressed_size
+        compressed = produced = 0
+        crc = 0
+
+        while True:
+            if remaining is not None:
+                if remaining == 0:
+                    break
+                data = await self._read_some(min(_READ_SIZE, remaining))
+                if not data:
+                    raise ZipRejected("truncated ZIP archive")
+                remaining -= len(data)
+            else:
+                data = await self._read_some(_READ_SIZE)
+                if not data:
+                    raise ZipRejected("truncated ZIP archive")
+
+            # Inflate at most _READ_SIZE bytes at a time so the limits below
+            # are checked per output block, not per (possibly huge) chunk
+            while data:
+                if inflater:
+                    out = inflater.decompress(data, _READ_SIZE)
+                    tail = inflater.unconsumed_tail
+                    compressed += len(data) - len(tail) - len(inflater.unused_data)
+                    data = tail
+                else:
+                    out, data = data, b""
+                    compressed += len(out)
+                produced += len(out)
+                self.total_uncompressed += len(out)
+                if produced > ZIP_MAX_RATIO * max(compressed, 4096):
+                    raise ZipRejected(
+                        f"ZIP member {member.name!r} exceeds compression ratio "
+                        f"{ZIP_MAX_RATIO:g}"
+                    )
+                if self.total_uncompressed > ZIP_MAX_TOTAL_BYTES:
+                    raise ZipRejected(
+                        f"ZIP expands beyond {ZIP_MAX_TOTAL_BYTES} bytes"
+                    )
+                crc = zlib.crc32(out, crc)
+                if out:
+                    yield out
+                if inflater and inflater.eof:
+                    break
+            if inflater and inflater.eof:
+                # Member ended inside this chunk: give the rest back to the stream
+                self._buf[:0] = inflater.unused_data
+                break
+
+        if member.compressed_size is None:
+            member.crc = await self._read_descriptor(member.zip64)
+        if inflater and not inflater.eof:
+            raise ZipRejected(f"corrupt deflate data in {member.name!r}")
+        if crc != member.crc:
+            raise ZipRejected(f"CRC mismatch in {member.name!r}")
+
+    async def _read_descriptor(self, zip64: bool) -> int:
+        await self._fill(4)
+        if struct.unpack("<I", bytes(self._buf[:4]))[0] == _DATA_DESCRIPTOR:
+            await self._read_exact(4)
+        (crc,) = struct.unpack("<I", await self._read_exact(4))
+        await self._read_exact(16 if zip64 else 8)  # sizes, already enforced
+        return crc
+
+
+def safe_member_filename(name: str) -> Optional[str]:
+    """
+    Flatten a member path to a plain file name inside the job folder.
+
+    Returns:
+        The sanitized name, or None for directories, metadata and non-PDFs
+    """
+    parts = [p for p in name.replace("\\", "/").split("/") if p not in ("", ".", "..")]
+    if not parts or name.endswith(("/", "\\")):
+        return None
+    if any(p == "__MACOSX" for p in parts):
+        return None
+    filename = parts[-1]
+    if filename.startswith(".") or not filename.lower().endswith(".pdf"):
+        return None
+    # Drop control characters and anything a filesystem might interpret
+    filename = "".join(c for c in filename if c.isprintable() and c not in ':*?"<>|')
+    return filename or None
@@ -0,0 +1,64 @@
+from app.services.compaction import PREAMBLE, compact, segment
+
+RESUME = """# Jane Doe
+jane@example.com | +1 555 123 4567
+
+## Summary
+Backend engineer with eight years of experience.
+
+## Work Experience
+Senior Engineer, Acme Corp
+- Built the billing platform in Python
+
+## Education
+BSc Computer Science, State University
+
+## Skills
+Python, PostgreSQL, Kubernetes
+"""
+
+
+def _with_hobbies(lines: int) -> str:
+    hobbies = "\n".join(f"- Hobby number {i} with a longer description" for i in range(lines))
+    return RESUME + "\n## Hobbies\n" + hobbies + "\n"
+
+
+def test_unknown_markdown_headings_open_their_own_section():
+    text = RESUME + "\n## Volunteer Work\n- Food bank\n\n## Side Projects\n- A CLI tool\n"
+
+    sections = dict(segment(text))
+
+    assert sections["Skills"] == ["Python, PostgreSQL, Kubernetes"]
+    assert sections["Volunteer Work"] == ["- Food bank"]
+    assert sections["Side Projects"] == ["- A CLI tool"]
+
+
+def test_leading_unknown_heading_stays_in_preamble():
+    [(title, lines), *_] = segment(RESUME)
+
+    assert title == PREAMBLE
+    assert lines[0] == "Jane Doe"
+
+
+def test_low_priority_sections_are_trimmed_first():
+    text = _with_hobbies(340)
+
+    compacted, report = compact(text, token_budget=200)
+
+    assert list(report["truncated_lines"]) == ["Hobbies"]
+    assert report["tokens_after"] <= 200
+    for title in ("Summary", "Work Experience", "Education", "Skills"):
+        assert f"## {title}" in compacted
+    assert "Built the billing platform" in compacted
+
+
+def test_unknown_section_is_trimmed_after_hobbies_and_before_summary():
+    text = _with_hobbies(20) + "\n## Community Garden\n"
+    text += "\n".join(f"- Garden task {i} done over many weekends" for i in range(20))
+
+    _, report = compact(text, token_budget=90)
+
+    assert report["dropped_sections"] == ["Hobbies"]
+    assert "Community Garden" in report["truncated_lines"]
+    assert "Summary" not in report["truncated_lines"]
+    assert "Work Experience" not in report["truncated_lines"]
@@ -0,0 +1,55 @@
+import sqlite3
+
+from app.services.dedup import NearDuplicateIndex
+
+TEXTS = [
+    " ".join(f"{topic} word{i}" for i in range(60))
+    for topic in ("python", "java", "golang")
+]
+
+
+def _add(index, i):
+    index.add(
+        f"doc-{i}",
+        index.signature(TEXTS[i]),
+        {"name": f"candidate {i}"},
+        "v1",
+        "model",
+        job_id="job",
+        filename=f"{i}.pdf",
+    )
+
+
+def _counts(index):
+    with sqlite3.connect(index.db_path) as conn:
+        return [
+            conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("documents", "bands")
+        ]
+
+
+def test_index_is_capped_and_evicts_least_recently_matched(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "fp.sqlite3"), max_entries=2)
+    _add(index, 0)
+    _add(index, 1)
+    # Matching doc-0 makes doc-1 the least recently used
+    assert index.query(index.signature(TEXTS[0]), "v1", "model")[0] == "doc-0"
+
+    _add(index, 2)
+
+    assert _counts(index) == [2, 2 * index.bands]
+    assert index.evictions == 1
+    assert index.query(index.signature(TEXTS[1]), "v1", "model") is None
+    assert index.query(index.signature(TEXTS[0]), "v1", "model")[0] == "doc-0"
+
+
+def test_match_requires_same_version_and_model(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "fp.sqlite3"))
+    _add(index, 0)
+    signature = index.signature(TEXTS[0])
+
+    assert index.query(signature, "v2", "model") is None
+    assert index.query(signature, "v1", "other") is None
+    assert index.query(signature, "v1", "model", exclude=("job", "0.pdf")) is None
+    doc_hash, similarity, record = index.query(signature, "v1", "model")
+    assert similarity == 1.0 and record["profile"] == {"name": "candidate 0"}
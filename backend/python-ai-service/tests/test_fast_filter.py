@@ -0,0 +1,87 @@
+from app.services.fast_filter import (
+    FAST_FILTER_THRESHOLD,
+    extract_skills,
+    parse_job_requirements,
+    score_candidate,
+)
+
+# Typical output of jobs.job_desc_prompt
+GENERATED_JOB_DESCRIPTION = """### Frontend Engineer — Job Description
+
+### Technical Skills (Required)
+- Strong proficiency in JavaScript and TypeScript
+- Extensive experience with React and its ecosystem (Redux, React Router)
+- Familiarity with version control systems (Git)
+- Experience consuming RESTful APIs and GraphQL
+
+### Nice to Have
+- Experience with Next.js
+- Knowledge of testing frameworks (Jest, Cypress)
+
+### Years of Experience Needed
+- **3-5 years**
+
+### Relevant Industry/Project Experience
+- Building customer-facing web applications in e-commerce or fintech
+
+### Education Requirement
+- Bachelor's degree in Computer Science or a related field
+
+### Responsibilities
+- Develop and maintain user interfaces with React
+- Collaborate with designers and backend engineers
+"""
+
+
+def test_parses_skill_tokens_from_generated_description():
+    requirements = parse_job_requirements(GENERATED_JOB_DESCRIPTION)
+
+    assert requirements["essential_skills"] == [
+        "javascript",
+        "typescript",
+        "react",
+        "redux",
+        "react router",
+        "git",
+        "restful apis",
+        "graphql",
+    ]
+    assert requirements["min_years"] == 3
+    assert requirements["max_years"] == 5
+    assert requirements["education_level"] == 2
+
+
+def test_nice_to_have_skills_are_not_essential():
+    skills = parse_job_requirements(GENERATED_JOB_DESCRIPTION)["essential_skills"]
+
+    assert "next" not in skills and "jest" not in skills
+
+
+def test_extract_skills_handles_lists_labels_and_slashes():
+    assert extract_skills("- Python, Django, PostgreSQL") == [
+        "python",
+        "django",
+        "postgresql",
+    ]
+    assert extract_skills("- Frontend: React.js / TypeScript") == [
+        "react",
+        "typescript",
+    ]
+    assert extract_skills("- HTML/CSS and CI/CD") == ["html", "css", "ci cd"]
+    assert extract_skills("- Familiarity with version control systems") == []
+
+
+def test_strong_candidate_passes_default_threshold():
+    requirements = parse_job_requirements(GENERATED_JOB_DESCRIPTION)
+    candidate = {
+        "skills": ["JavaScript", "TypeScript", "React.js", "Redux", "Git", "GraphQL"],
+        "resume_summary": "Frontend engineer building React apps.",
+        "years_of_experience": None,
+        "education": [],
+    }
+
+    result = score_candidate(candidate, requirements)
+
+    assert result["skills_score"] >= 0.75
+    assert result["score"] >= FAST_FILTER_THRESHOLD
+    assert "react router" in result["missing_skills"]
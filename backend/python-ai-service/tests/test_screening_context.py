@@ -0,0 +1,110 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("weaviate")
+pytest.importorskip("google.genai")
+
+from app.routers import screening  # noqa: E402
+from app.services.context_cache import LocalContext  # noqa: E402
+from app.services.local_cache import LocalCache  # noqa: E402
+
+JOB_DESC = "### Backend Engineer\n\n### Technical Skills (Required)\n- Python"
+
+EVALUATION = {
+    "years_experience_score": 7,
+    "skills": {"score": 8},
+    "industry_relevance": {"score": 6},
+    "achievements_and_certs": {"score": 5},
+    "education_alignment": {"score": 7},
+    "overall_score_0_to_100": 72,
+    "summary": "Solid backend profile.",
+}
+
+
+def _candidate(i: int) -> dict:
+    return {
+        "candidate_id": f"cand-{i}",
+        "name": f"Candidate {i}",
+        "skills": ["Python"],
+        "resume_summary": f"Backend engineer number {i}",
+        "experience": [],
+        "projects": [],
+        "years_of_experience": 4,
+        "education": [],
+        "applied_to_job": True,
+        "original_job_id": None,
+    }
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    """screen_job over stubbed search hits with LocalContext as the context"""
+    monkeypatch.setattr(
+        screening,
+        "evaluation_cache",
+        LocalCache(str(tmp_path / "evaluations.sqlite3"), 1 << 20, name="test_eval"),
+    )
+    monkeypatch.setattr(
+        screening,
+        "screening_runs",
+        LocalCache(str(tmp_path / "runs.sqlite3"), 1 << 20, name="test_runs"),
+    )
+    monkeypatch.setattr(screening, "fetch_job_title", lambda job_id: None)
+    monkeypatch.setattr(
+        screening,
+        "hybrid_search_all_candidates",
+        lambda *args, **kwargs: [_candidate(i) for i in range(3)],
+    )
+    prompts = []
+
+    def generate(prompt, config):
+        prompts.append(prompt)
+        return SimpleNamespace(text=json.dumps(EVALUATION), usage_metadata=None)
+
+    opened = []
+
+    def open_context(job_id, job_desc, provider_cache):
+        context = LocalContext(screening.evaluation_context_prefix(job_desc), generate)
+        opened.append((context, provider_cache))
+        return context
+
+    def screen():
+        req = screening.ScreeningRequest(job_id="job-1", context_cache=True)
+        return screening.screen_job(req, JOB_DESC, [0.0], open_context=open_context)
+
+    return SimpleNamespace(screen=screen, opened=opened, prompts=prompts)
+
+
+def test_only_resumes_are_sent_through_the_run_context(run):
+    result = run.screen()
+
+    assert result["stats"]["total_evaluated"] == 3
+    [(context, provider_cache)] = run.opened
+    assert provider_cache is True
+    assert len(context.sent) == 3
+    for suffix in context.sent:
+        assert "Backend engineer number" in suffix
+        assert JOB_DESC not in suffix
+    assert all(prompt.startswith(context.prefix) for prompt in run.prompts)
+    assert result["stats"]["context_cache"]["calls"] == 3
+
+
+def test_context_is_released_when_the_run_ends(run):
+    run.screen()
+
+    [(context, _)] = run.opened
+    assert context.closed
+    with pytest.raises(RuntimeError):
+        context.generate("late call", {})
+
+
+def test_repeat_run_served_from_cache_skips_provider_cache(run):
+    run.screen()
+    result = run.screen()
+
+    assert result["stats"]["cache_hits"] == 3
+    _, provider_cache = run.opened[-1]
+    assert provider_cache is False
+    assert run.opened[-1][0].sent == []
@@ -0,0 +1,37 @@
+import asyncio
+
+from app.services.uploads import RequestSizeLimit
+
+
+def _call(path, headers):
+    """(status, body read by the app) of one request through RequestSizeLimit"""
+    received = []
+    sent = []
+
+    async def app(scope, receive, send):
+        received.append(await receive())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": b"payload", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": path, "headers": headers}
+    asyncio.run(RequestSizeLimit(app, 100, ["/api/resumes/upload"])(scope, receive, send))
+    return sent[0]["status"], received
+
+
+def test_oversized_upload_is_rejected_before_the_body_is_read():
+    status, received = _call("/api/resumes/upload", [(b"content-length", b"101")])
+
+    assert status == 413
+    assert received == []
+
+
+def test_requests_within_limit_or_on_other_paths_pass_through():
+    assert _call("/api/resumes/upload", [(b"content-length", b"100")])[0] == 200
+    assert _call("/api/resumes/upload", [])[0] == 200
+    assert _call("/api/jobs", [(b"content-length", b"101")])[0] == 200
@@ -0,0 +1,150 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+
+from app.services import zip_stream
+from app.services.zip_stream import ZipRejected, ZipStreamReader, safe_member_filename
+
+PDF = b"%PDF-1.4\n" + b"resume body " * 2000
+
+
+class _Unseekable(io.RawIOBase):
+    """Write-only sink: zipfile falls back to data descriptors, like a stream"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.data += b
+        return len(b)
+
+
+def _archive(members, compression=zipfile.ZIP_DEFLATED, streamed=False, zip64=False):
+    sink = _Unseekable() if streamed else io.BytesIO()
+    with zipfile.ZipFile(sink, "w", compression) as zf:
+        for name, data in members:
+            with zf.open(name, "w", force_zip64=zip64) as f:
+                f.write(data)
+    return bytes(sink.data) if streamed else sink.getvalue()
+
+
+async def _chunks(data, size=1000):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def _read(data, read=None):
+    """{member name: bytes read}; read(name) -> False leaves a member unread"""
+
+    async def run():
+        out = {}
+        reader = ZipStreamReader(_chunks(data))
+        async for member in reader.members_iter():
+            if read and not read(member.name):
+                continue
+            out[member.name] = b"".join([c async for c in member.chunks()])
+        return out
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED], ids=["stored", "deflated"]
+)
+def test_reads_members(compression):
+    data = _archive([("a.pdf", PDF), ("dir/b.pdf", PDF[::-1])], compression)
+
+    assert _read(data) == {"a.pdf": PDF, "dir/b.pdf": PDF[::-1]}
+
+
+def test_reads_streamed_archive_with_data_descriptors():
+    data = _archive([("a.pdf", PDF), ("b.pdf", b"second")], streamed=True)
+    assert zipfile.ZipFile(io.BytesIO(data)).infolist()[0].flag_bits & 0x8
+
+    assert _read(data) == {"a.pdf": PDF, "b.pdf": b"second"}
+
+
+def test_reads_zip64_members():
+    data = _archive([("a.pdf", PDF), ("b.pdf", b"second")], zip64=True)
+
+    assert _read(data) == {"a.pdf": PDF, "b.pdf": b"second"}
+
+
+def test_unread_members_are_skipped():
+    data = _archive([("skip.pdf", PDF), ("keep.pdf", b"kept")], streamed=True)
+
+    assert _read(data, read=lambda name: name == "keep.pdf") == {"keep.pdf": b"kept"}
+
+
+def test_crc_mismatch_is_rejected():
+    data = bytearray(_archive([("a.pdf", PDF)], zipfile.ZIP_STORED))
+    body = data.index(b"%PDF")
+    data[body + 100] ^= 0xFF
+
+    with pytest.raises(ZipRejected, match="CRC"):
+        _read(bytes(data))
+
+
+def test_zero_filled_bomb_is_rejected_early():
+    bomb = _archive([("bomb.pdf", bytes(50 * 1024 * 1024))])
+
+    async def run():
+        reader = ZipStreamReader(_chunks(bomb, size=64 * 1024))
+        with pytest.raises(ZipRejected, match="compression ratio"):
+            async for member in reader.members_iter():
+                await member.skip()
+        return reader.total_uncompressed
+
+    # Inflation stops within one output block of the limit, long before 50 MB
+    limit = zip_stream.ZIP_MAX_RATIO * len(bomb)
+    assert asyncio.run(run()) <= limit + 64 * 1024
+
+
+def test_total_and_member_limits(monkeypatch):
+    data = _archive([("a.pdf", PDF), ("b.pdf", PDF)])
+
+    monkeypatch.setattr(zip_stream, "ZIP_MAX_TOTAL_BYTES", len(PDF) + 1)
+    with pytest.raises(ZipRejected, match="expands beyond"):
+        _read(data)
+
+    monkeypatch.setattr(zip_stream, "ZIP_MAX_TOTAL_BYTES", 10 * len(PDF))
+    monkeypatch.setattr(zip_stream, "ZIP_MAX_MEMBERS", 1)
+    with pytest.raises(ZipRejected, match="more than 1 members"):
+        _read(data)
+
+
+# Inside the local header, the member name, and the member data
+@pytest.mark.parametrize("cut", [10, 32, 5000])
+def test_truncated_archive_is_rejected(cut):
+    data = _archive([("a.pdf", PDF)], zipfile.ZIP_STORED)
+
+    with pytest.raises(ZipRejected, match="truncated"):
+        _read(data[:cut])
+
+
+def test_not_a_zip_is_rejected():
+    with pytest.raises(ZipRejected, match="not a ZIP"):
+        _read(b"%PDF-1.4 not an archive")
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("resume.pdf", "resume.pdf"),
+        ("../../etc/evil.pdf", "evil.pdf"),
+        ("..\\..\\evil.PDF", "evil.PDF"),
+        ("/abs/path/cv.pdf", "cv.pdf"),
+        ("bad:name?.pdf", "badname.pdf"),
+        ("folder/", None),
+        ("__MACOSX/._resume.pdf", None),
+        (".hidden.pdf", None),
+        ("notes.txt", None),
+    ],
+)
+def test_safe_member_filename(name, expected):
+    assert safe_member_filename(name) == expected